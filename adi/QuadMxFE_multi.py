@@ -6,9 +6,10 @@ import time
 from typing import List
 
 from adi.ad9081_mc import QuadMxFE
+from adi.sync_start import sync_start_multi
 
 
-class QuadMxFE_multi(object):
+class QuadMxFE_multi(sync_start_multi):
     """ADQUADMXFExEBZ Multi-SOM Manager
 
     parameters:
@@ -46,6 +47,7 @@ class QuadMxFE_multi(object):
         self._resync_tx = False
         self._rx_initialized = False
         self._request_sysref_carrier = False
+        self.jesd204_fsm_timings = {}
         self.primary = QuadMxFE(uri=primary_uri)
         self.secondaries = []
         self.samples_primary = []
@@ -53,6 +55,12 @@ class QuadMxFE_multi(object):
         for uri in secondary_uris:
             self.secondaries.append(QuadMxFE(uri=uri))
 
+        if primary_jesd:
+            self.primary._jesd = primary_jesd
+        for dev, jesd in zip(self.secondaries, secondary_jesds):
+            if jesd:
+                dev._jesd = jesd
+
         for dev in self.secondaries + [self.primary]:
             dev._rxadc.set_kernel_buffers_count(1)
 
@@ -103,68 +111,6 @@ class QuadMxFE_multi(object):
         self.__read_jesd_status_all_devs("Initial Lane Alignment Sequence", True)
         self.__read_jesd_status_all_devs("Initial Frame Synchronization", True)
 
-    def _device_is_running(self, dev, index, verbose):
-        err = dev.jesd204_fsm_error
-        paused = dev.jesd204_fsm_paused
-        state = dev.jesd204_fsm_state
-
-        if verbose:
-            print(
-                "%s: DEVICE%d: Is <%s> in state <%s> with status <%d>"
-                % (dev.uri, index, "Paused" if paused else "Running", state, err)
-            )
-
-        if err:
-            print(
-                "\nERROR %s: DEVICE%d: Is <%s> in state <%s> with status <%d>\n"
-                % (dev.uri, index, "Paused" if paused else "Running", state, err)
-            )
-            return "error"
-
-        state_last = state == "opt_post_running_stage"
-
-        if (state_last == 0) and (paused == 0):
-            return "running"
-
-        if (state_last == 0) and (paused == 1):
-            return "paused"
-
-        if (state_last == 1) and (paused == 0):
-            return "done"
-
-        assert False
-
-    def __jesd204_fsm_is_done(self):
-        cnt = 0
-        for index, dev in enumerate([self.primary] + self.secondaries):
-            ret = self._device_is_running(dev, index, 0)
-
-            if ret == "done":
-                cnt += 1
-
-        if cnt == len([self.primary] + self.secondaries):
-            return "done"
-
-    def _jesd204_fsm_sync(self):
-        while True:
-            stat = self.__jesd204_fsm_is_done()
-            if stat == "done":
-                return "done"
-
-            for index, dev in enumerate(self.secondaries + [self.primary]):
-                ret = self._device_is_running(dev, index, self._jesd_fsm_show_status)
-                if index == 0:
-                    statep = dev.jesd204_fsm_state
-                else:
-                    state = dev.jesd204_fsm_state
-                    assert state == statep
-
-                if ret == "paused":
-                    dev.jesd204_fsm_resume = "1"
-
-                if ret == "error":
-                    return ret
-
     def __unsync(self):
         for dev in [self.primary] + self.secondaries:
             dev._clock_chip.attrs["sleep_request"].value = "1"
@@ -247,87 +193,33 @@ class QuadMxFE_multi(object):
             dev._clock_chip.reg_write(0xCB + offs, int(val) & 0x1F)
             dev._clock_chip.reg_write(0xCC + offs, int(digital) & 0x1F)
 
-    def __rx_dma_arm(self):
-        for dev in self.secondaries + [self.primary]:
-            if self._dma_show_arming:
-                print("--DMA ARMING--", dev.uri)
-            dev.rx_sync_start = "arm"
-            if self._dma_show_arming:
-                print("\n--DMA ARMED--", dev.uri)
-
-    def __dds_sync_enable(self, enable):
-        for dev in self.secondaries + [self.primary]:
-            if self._dma_show_arming:
-                print("--DAC SYNC ARMING--", dev.uri)
-            dev.tx_sync_start = "arm"
-
     def sysref_request(self):
         """ sysref_request: Sysref request for parent HMC7044 """
         self.primary._clock_chip_ext.attrs["sysref_request"].value = "1"
 
-    def __refill_samples(self, dev, is_primary):
-        if is_primary:
-            self.samples_primary = dev.rx()
-        else:
-            self.samples_secondary = dev.rx()
-
     def _pre_rx_setup(self):
-        retries = 10
-        for _ in range(retries):
-            try:
-                for dev in [self.primary] + self.secondaries:
-                    dev.jesd204_fsm_ctrl = 0
-
-                self.__unsync()
-
-                for dev in [self.primary] + self.secondaries:
-                    dev.jesd204_fsm_ctrl = 1
-
-                self._jesd204_fsm_sync()
-
-                if not self._resync_tx:
-                    self.__dds_sync_enable(1)
-
-                if self._clk_chip_show_cap_bank_sel:
-                    print("HMC7044s CAP bank select: ", self.hmc7044_cap_sel())
-
-                if self._jesd_show_status:
-                    self.__read_jesd_status()
-                    self.__read_jesd_link_status()
-
-                for dev in [self.primary] + self.secondaries:
-                    dev.rx_destroy_buffer()
-                    dev._rx_init_channels()
-                return
-            except:  # noqa: E722
-                print("Re-initializing due to lock-up")
-                self.reinitialize()
-        raise Exception("Unable to initialize (Board reboot required)")
-
-    def rx(self):
-        """Receive data from multiple hardware buffers for each channel index in
-        rx_enabled_channels of each child object (primary,secondaries[indx]).
-
-        returns: type=numpy.array or list of numpy.array
-            An array or list of arrays when more than one receive channel
-            is enabled containing samples from a channel or set of channels.
-            Data will be complex when using a complex data device.
-        """
-        if not self._rx_initialized:
-            self._pre_rx_setup()
-            self._rx_initialized = True
-        data = []
-        self.__rx_dma_arm()
-        # Recreate all buffers
-        for dev in [self.primary] + self.secondaries:
-            dev.rx_destroy_buffer()
-            dev._rx_init_channels()
+        self._retry_pre_rx_setup(self.__pre_rx_setup, retries=10)
 
-        if self._resync_tx:
-            self.__dds_sync_enable(1)
+    def __pre_rx_setup(self):
+        for dev in [self.primary] + self.secondaries:
+            dev.jesd204_fsm_ctrl = 0
 
-        self.sysref_request()
+        self.__unsync()
 
         for dev in [self.primary] + self.secondaries:
-            data += dev.rx()
-        return data
+            dev.jesd204_fsm_ctrl = 1
+
+        if self._jesd204_fsm_sync() == "error":
+            raise Exception("JESD204 FSM error")
+
+        if not self._resync_tx:
+            self._dds_sync_enable(1)
+
+        if self._clk_chip_show_cap_bank_sel:
+            print("HMC7044s CAP bank select: ", self.hmc7044_cap_sel())
+
+        if self._jesd_show_status:
+            self.__read_jesd_status()
+            self.__read_jesd_link_status()
+
+        self._map_devices(self._recreate_rx_buffer)
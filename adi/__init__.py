@@ -2,136 +2,196 @@
 #
 # SPDX short identifier: ADIBSD
 
-from adi.ad2s1210 import ad2s1210
-from adi.ad405x import ad405x
-from adi.ad469x import ad469x
-from adi.ad579x import ad579x
-from adi.ad717x import ad717x
-from adi.ad719x import ad719x
-from adi.ad738x import ad738x
-from adi.ad777x import ad777x
-from adi.ad936x import Pluto, ad9361, ad9363, ad9364
-from adi.ad937x import ad9371, ad9375
-from adi.ad3552r import ad3552r
-from adi.ad3552r_hs import ad3552r_hs
-from adi.ad4020 import ad4000, ad4001, ad4002, ad4003, ad4020
-from adi.ad4110 import ad4110
-from adi.ad4130 import ad4130
-from adi.ad4170 import ad4170
-from adi.ad4630 import ad4630, adaq42xx
-from adi.ad4858 import ad4858
-from adi.ad5592r import ad5592r
-from adi.ad5686 import ad5686
-from adi.ad5754r import ad5754r
-from adi.ad5940 import ad5940
-from adi.ad6676 import ad6676
-from adi.ad7124 import ad7124
-from adi.ad7134 import ad7134
-from adi.ad7291 import ad7291
-from adi.ad7606 import ad7606
-from adi.ad7689 import ad7689
-from adi.ad7746 import ad7746
-from adi.ad7768 import ad7768, ad7768_4
-from adi.ad7799 import ad7799
-from adi.ad9081 import ad9081
-from adi.ad9081_mc import QuadMxFE, ad9081_mc
-from adi.ad9083 import ad9083
-from adi.ad9084 import ad9084
-from adi.ad9084_mc import Triton, ad9084_mc
-from adi.ad9094 import ad9094
-from adi.ad9136 import ad9136
-from adi.ad9144 import ad9144
-from adi.ad9152 import ad9152
-from adi.ad9162 import ad9162
-from adi.ad9166 import ad9166
-from adi.ad9172 import ad9172
-from adi.ad9213 import ad9213
-from adi.ad9250 import ad9250
-from adi.ad9265 import ad9265
-from adi.ad9434 import ad9434
-from adi.ad9467 import ad9467
-from adi.ad9625 import ad9625
-from adi.ad9680 import ad9680
-from adi.ada4961 import ada4961
-from adi.adaq8092 import adaq8092
-from adi.adar1000 import adar1000, adar1000_array
-from adi.adf4159 import adf4159
-from adi.adf4355 import adf4355
-from adi.adf4371 import adf4371
-from adi.adf5610 import adf5610
-from adi.adg2128 import adg2128
-from adi.adis16460 import adis16460
-from adi.adis16475 import adis16475
-from adi.adis16480 import (
-    adis16375,
-    adis16480,
-    adis16485,
-    adis16488,
-    adis16490,
-    adis16495,
-    adis16497,
-    adis16545,
-    adis16547,
-)
-from adi.adis16507 import adis16507
-from adi.adis16550 import adis16550
-from adi.adl5240 import adl5240
-from adi.adl5960 import adl5960
-from adi.admv8818 import admv8818
-from adi.adpd188 import adpd188
-from adi.adpd410x import adpd410x
-from adi.adpd1080 import adpd1080
-from adi.adrf5720 import adrf5720
-from adi.adrv9002 import adrv9002
-from adi.adrv9009 import adrv9009
-from adi.adrv9009_zu11eg import adrv9009_zu11eg
-from adi.adrv9009_zu11eg_fmcomms8 import adrv9009_zu11eg_fmcomms8
-from adi.adrv9009_zu11eg_multi import adrv9009_zu11eg_multi
-from adi.adt7420 import adt7420
-from adi.adxl313 import adxl313
-from adi.adxl345 import adxl345
-from adi.adxl355 import adxl355
-from adi.adxl380 import adxl380
-from adi.adxrs290 import adxrs290
-from adi.cn0511 import cn0511
-from adi.cn0532 import cn0532
-from adi.cn0554 import cn0554
-from adi.cn0556 import cn0556
-from adi.cn0565 import cn0565
-from adi.cn0566 import CN0566
-from adi.cn0575 import cn0575
-from adi.cn0579 import cn0579
-from adi.daq2 import DAQ2
-from adi.daq3 import DAQ3
-from adi.fmc_vna import fmcvna
-from adi.fmcadc3 import fmcadc3
-from adi.fmcjesdadc1 import fmcjesdadc1
-from adi.fmclidar1 import fmclidar1
-from adi.fmcomms5 import FMComms5
-from adi.fmcomms11 import FMComms11
-from adi.gen_mux import genmux
-from adi.lm75 import lm75
-from adi.ltc2314_14 import ltc2314_14
-from adi.ltc2387 import ltc2387
-from adi.ltc2499 import ltc2499
-from adi.ltc2664 import ltc2664
-from adi.ltc2672 import ltc2672
-from adi.ltc2688 import ltc2688
-from adi.ltc2983 import ltc2983
-from adi.max9611 import max9611
-from adi.max11205 import max11205
-from adi.max14001 import max14001
-from adi.max31855 import max31855
-from adi.max31865 import max31865
-from adi.one_bit_adc_dac import one_bit_adc_dac
-from adi.QuadMxFE_multi import QuadMxFE_multi
-from adi.tdd import tdd
-from adi.tddn import tddn
+import importlib
+import sys
+from types import ModuleType
 
-try:
-    from adi.jesd import jesd
-except ImportError:
-    pass
+# Device classes are imported on first access so "import adi" does not load
+# every driver module and its dependencies. Maps class names to modules
+_lazy_imports = {
+    "ad2s1210": "adi.ad2s1210",
+    "ad405x": "adi.ad405x",
+    "ad469x": "adi.ad469x",
+    "ad579x": "adi.ad579x",
+    "ad717x": "adi.ad717x",
+    "ad719x": "adi.ad719x",
+    "ad738x": "adi.ad738x",
+    "ad777x": "adi.ad777x",
+    "Pluto": "adi.ad936x",
+    "ad9361": "adi.ad936x",
+    "ad9363": "adi.ad936x",
+    "ad9364": "adi.ad936x",
+    "ad9371": "adi.ad937x",
+    "ad9375": "adi.ad937x",
+    "ad3552r": "adi.ad3552r",
+    "ad3552r_hs": "adi.ad3552r_hs",
+    "ad4000": "adi.ad4020",
+    "ad4001": "adi.ad4020",
+    "ad4002": "adi.ad4020",
+    "ad4003": "adi.ad4020",
+    "ad4020": "adi.ad4020",
+    "ad4110": "adi.ad4110",
+    "ad4130": "adi.ad4130",
+    "ad4170": "adi.ad4170",
+    "ad4630": "adi.ad4630",
+    "adaq42xx": "adi.ad4630",
+    "ad4858": "adi.ad4858",
+    "ad5592r": "adi.ad5592r",
+    "ad5686": "adi.ad5686",
+    "ad5754r": "adi.ad5754r",
+    "ad5940": "adi.ad5940",
+    "ad6676": "adi.ad6676",
+    "ad7124": "adi.ad7124",
+    "ad7134": "adi.ad7134",
+    "ad7291": "adi.ad7291",
+    "ad7606": "adi.ad7606",
+    "ad7689": "adi.ad7689",
+    "ad7746": "adi.ad7746",
+    "ad7768": "adi.ad7768",
+    "ad7768_4": "adi.ad7768",
+    "ad7799": "adi.ad7799",
+    "ad9081": "adi.ad9081",
+    "QuadMxFE": "adi.ad9081_mc",
+    "ad9081_mc": "adi.ad9081_mc",
+    "ad9083": "adi.ad9083",
+    "ad9084": "adi.ad9084",
+    "Triton": "adi.ad9084_mc",
+    "ad9084_mc": "adi.ad9084_mc",
+    "ad9094": "adi.ad9094",
+    "ad9136": "adi.ad9136",
+    "ad9144": "adi.ad9144",
+    "ad9152": "adi.ad9152",
+    "ad9162": "adi.ad9162",
+    "ad9166": "adi.ad9166",
+    "ad9172": "adi.ad9172",
+    "ad9213": "adi.ad9213",
+    "ad9250": "adi.ad9250",
+    "ad9265": "adi.ad9265",
+    "ad9434": "adi.ad9434",
+    "ad9467": "adi.ad9467",
+    "ad9625": "adi.ad9625",
+    "ad9680": "adi.ad9680",
+    "ada4961": "adi.ada4961",
+    "adaq8092": "adi.adaq8092",
+    "adar1000": "adi.adar1000",
+    "adar1000_array": "adi.adar1000",
+    "adf4159": "adi.adf4159",
+    "adf4355": "adi.adf4355",
+    "adf4371": "adi.adf4371",
+    "adf5610": "adi.adf5610",
+    "adg2128": "adi.adg2128",
+    "adis16460": "adi.adis16460",
+    "adis16475": "adi.adis16475",
+    "adis16375": "adi.adis16480",
+    "adis16480": "adi.adis16480",
+    "adis16485": "adi.adis16480",
+    "adis16488": "adi.adis16480",
+    "adis16490": "adi.adis16480",
+    "adis16495": "adi.adis16480",
+    "adis16497": "adi.adis16480",
+    "adis16545": "adi.adis16480",
+    "adis16547": "adi.adis16480",
+    "adis16507": "adi.adis16507",
+    "adis16550": "adi.adis16550",
+    "adl5240": "adi.adl5240",
+    "adl5960": "adi.adl5960",
+    "admv8818": "adi.admv8818",
+    "adpd188": "adi.adpd188",
+    "adpd410x": "adi.adpd410x",
+    "adpd1080": "adi.adpd1080",
+    "adrf5720": "adi.adrf5720",
+    "adrv9002": "adi.adrv9002",
+    "adrv9009": "adi.adrv9009",
+    "adrv9009_zu11eg": "adi.adrv9009_zu11eg",
+    "adrv9009_zu11eg_fmcomms8": "adi.adrv9009_zu11eg_fmcomms8",
+    "adrv9009_zu11eg_multi": "adi.adrv9009_zu11eg_multi",
+    "adt7420": "adi.adt7420",
+    "adxl313": "adi.adxl313",
+    "adxl345": "adi.adxl345",
+    "adxl355": "adi.adxl355",
+    "adxl380": "adi.adxl380",
+    "adxrs290": "adi.adxrs290",
+    "cn0511": "adi.cn0511",
+    "cn0532": "adi.cn0532",
+    "cn0554": "adi.cn0554",
+    "cn0556": "adi.cn0556",
+    "cn0565": "adi.cn0565",
+    "CN0566": "adi.cn0566",
+    "cn0575": "adi.cn0575",
+    "cn0579": "adi.cn0579",
+    "DAQ2": "adi.daq2",
+    "DAQ3": "adi.daq3",
+    "fmcvna": "adi.fmc_vna",
+    "fmcadc3": "adi.fmcadc3",
+    "fmcjesdadc1": "adi.fmcjesdadc1",
+    "fmclidar1": "adi.fmclidar1",
+    "FMComms5": "adi.fmcomms5",
+    "FMComms11": "adi.fmcomms11",
+    "genmux": "adi.gen_mux",
+    "lm75": "adi.lm75",
+    "ltc2314_14": "adi.ltc2314_14",
+    "ltc2387": "adi.ltc2387",
+    "ltc2499": "adi.ltc2499",
+    "ltc2664": "adi.ltc2664",
+    "ltc2672": "adi.ltc2672",
+    "ltc2688": "adi.ltc2688",
+    "ltc2983": "adi.ltc2983",
+    "max9611": "adi.max9611",
+    "max11205": "adi.max11205",
+    "max14001": "adi.max14001",
+    "max31855": "adi.max31855",
+    "max31865": "adi.max31865",
+    "one_bit_adc_dac": "adi.one_bit_adc_dac",
+    "QuadMxFE_multi": "adi.QuadMxFE_multi",
+    "tdd": "adi.tdd",
+    "tddn": "adi.tddn",
+    "jesd": "adi.jesd",
+    "jesd_link_monitor": "adi.jesd",
+}
+
+__all__ = list(_lazy_imports)
 
 __version__ = "0.0.19"
 name = "Analog Devices Hardware Interfaces"
+
+
+def __getattr__(name):
+    module = _lazy_imports.get(name)
+    if module is None:
+        if name.startswith("_"):
+            raise AttributeError("module 'adi' has no attribute '{}'".format(name))
+        # Submodules such as adi.rx_tx stay reachable without importing them
+        submodule = "{}.{}".format(__name__, name)
+        try:
+            return importlib.import_module(submodule)
+        except ModuleNotFoundError as ex:
+            if ex.name != submodule:
+                raise AttributeError(
+                    "adi.{} is not available: {}".format(name, ex)
+                ) from ex
+            raise AttributeError(
+                "module 'adi' has no attribute '{}'".format(name)
+            ) from None
+    try:
+        value = getattr(importlib.import_module(module), name)
+    except ImportError as ex:
+        # Optional dependencies such as paramiko for jesd may be missing
+        raise AttributeError("adi.{} is not available: {}".format(name, ex)) from ex
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_imports))
+
+
+class _module(ModuleType):
+    def __setattr__(self, name, value):
+        # Importing a submodule binds it on the package. Most submodules share
+        # the name of their class, which must stay reachable as adi.<name>
+        if name in _lazy_imports and isinstance(value, ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _module
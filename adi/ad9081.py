@@ -2,6 +2,7 @@
 #
 # SPDX short identifier: ADIBSD
 
+from functools import cached_property
 from typing import Dict, List
 
 from adi.context_manager import context_manager
@@ -68,25 +69,15 @@ class ad9081(rx_tx, context_manager, sync_start):
     _rx_channel_names: List[str] = []
     _tx_channel_names: List[str] = []
     _tx_control_channel_names: List[str] = []
-    _rx_coarse_ddc_channel_names: List[str] = []
-    _tx_coarse_duc_channel_names: List[str] = []
-    _rx_fine_ddc_channel_names: List[str] = []
-    _tx_fine_duc_channel_names: List[str] = []
     _dds_channel_names: List[str] = []
     _device_name = ""
 
-    _path_map: Dict[str, Dict[str, Dict[str, List[str]]]] = {}
-
     def __init__(self, uri=""):
 
         # Reset default channel names
         self._rx_channel_names = []
         self._tx_channel_names = []
         self._tx_control_channel_names = []
-        self._rx_coarse_ddc_channel_names = []
-        self._tx_coarse_duc_channel_names = []
-        self._rx_fine_ddc_channel_names = []
-        self._tx_fine_duc_channel_names = []
         self._dds_channel_names = []
 
         context_manager.__init__(self, uri, self._device_name)
@@ -102,14 +93,6 @@ class ad9081(rx_tx, context_manager, sync_start):
         if self._tx_complex_data is None:
             self._tx_complex_data = are_channels_complex(self._txdac.channels)
 
-        # Get DDC and DUC mappings
-        paths = {}
-
-        for ch in self._rxadc.channels:
-            if "label" in ch.attrs:
-                paths = _map_to_dict(paths, ch)
-        self._path_map = paths
-
         # Get data + DDS channels
         for ch in self._rxadc.channels:
             if ch.scan_element and not ch.output:
@@ -129,11 +112,29 @@ class ad9081(rx_tx, context_manager, sync_start):
         )
         self._dds_channel_names = _sortconv(self._dds_channel_names, dds=True)
 
-        # Map unique attributes to channel properties
-        self._rx_fine_ddc_channel_names = []
-        self._rx_coarse_ddc_channel_names = []
-        self._tx_fine_duc_channel_names = []
-        self._tx_coarse_duc_channel_names = []
+        rx_tx.__init__(self)
+        sync_start.__init__(self)
+        self.rx_buffer_size = 2 ** 16
+
+    # DDC and DUC mappings require reading the label of every channel, so they
+    # are only built when a channelizer property is first used
+    @cached_property
+    def _path_map(self) -> Dict[str, Dict[str, Dict[str, List[str]]]]:
+        paths = {}
+        for ch in self._rxadc.channels:
+            if "label" in ch.attrs:
+                paths = _map_to_dict(paths, ch)
+        return paths
+
+    @cached_property
+    def _channelizer_channel_names(self):
+        """Map unique attributes to channel properties
+
+        Returns:
+            tuple: Coarse DDC, fine DDC, coarse DUC and fine DUC channel names
+        """
+        rx_coarse, rx_fine, tx_coarse, tx_fine = [], [], [], []
+        paths = self._path_map
         for converter in paths:
             for cdc in paths[converter]:
                 channels = []
@@ -143,15 +144,28 @@ class ad9081(rx_tx, context_manager, sync_start):
                     name for name in channels if "_q" not in name and "voltage" in name
                 ]
                 if "ADC" in converter:
-                    self._rx_coarse_ddc_channel_names.append(channels[0])
-                    self._rx_fine_ddc_channel_names += channels
+                    rx_coarse.append(channels[0])
+                    rx_fine += channels
                 else:
-                    self._tx_coarse_duc_channel_names.append(channels[0])
-                    self._tx_fine_duc_channel_names += channels
+                    tx_coarse.append(channels[0])
+                    tx_fine += channels
+        return rx_coarse, rx_fine, tx_coarse, tx_fine
 
-        rx_tx.__init__(self)
-        sync_start.__init__(self)
-        self.rx_buffer_size = 2 ** 16
+    @cached_property
+    def _rx_coarse_ddc_channel_names(self) -> List[str]:
+        return self._channelizer_channel_names[0]
+
+    @cached_property
+    def _rx_fine_ddc_channel_names(self) -> List[str]:
+        return self._channelizer_channel_names[1]
+
+    @cached_property
+    def _tx_coarse_duc_channel_names(self) -> List[str]:
+        return self._channelizer_channel_names[2]
+
+    @cached_property
+    def _tx_fine_duc_channel_names(self) -> List[str]:
+        return self._channelizer_channel_names[3]
 
     def _get_iio_attr_str_single(self, channel_name, attr, output):
         # This is overridden by subclasses
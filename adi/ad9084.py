@@ -2,6 +2,7 @@
 #
 # SPDX short identifier: ADIBSD
 
+from functools import cached_property
 from typing import Dict, List
 
 from adi.adrv9002 import rx1, rx2, tx1, tx2
@@ -12,9 +13,10 @@ from adi.sync_start import sync_start
 
 
 def _map_to_dict(paths, ch):
-    if ch.attrs["label"].value == "buffer_only":
+    label = ch.attrs["label"].value
+    if label == "buffer_only":
         return paths
-    side, fddc, cddc, adc = ch.attrs["label"].value.replace(":", "->").split("->")
+    side, fddc, cddc, adc = label.replace(":", "->").split("->")
     if side not in paths.keys():
         paths[side] = {}
     if adc not in paths[side].keys():
@@ -65,16 +67,10 @@ class ad9084(rx_tx, context_manager, sync_start):
     _tx_channel_names: List[str] = []
     _tx2_channel_names: List[str] = []
     _tx_control_channel_names: List[str] = []
-    _rx_coarse_ddc_channel_names: List[str] = []
-    _tx_coarse_duc_channel_names: List[str] = []
-    _rx_fine_ddc_channel_names: List[str] = []
-    _tx_fine_duc_channel_names: List[str] = []
     _dds_channel_names: List[str] = []
     _dds2_channel_names: List[str] = []
     _device_name = ""
 
-    _path_map: Dict[str, Dict[str, Dict[str, List[str]]]] = {}
-
     def __init__(
         self,
         uri="",
@@ -98,10 +94,6 @@ class ad9084(rx_tx, context_manager, sync_start):
         self._rx_channel_names = []
         self._tx_channel_names = []
         self._tx_control_channel_names = []
-        self._rx_coarse_ddc_channel_names = []
-        self._tx_coarse_duc_channel_names = []
-        self._rx_fine_ddc_channel_names = []
-        self._tx_fine_duc_channel_names = []
         self._dds_channel_names = []
 
         context_manager.__init__(self, uri, self._device_name)
@@ -120,14 +112,6 @@ class ad9084(rx_tx, context_manager, sync_start):
             if dev is None:
                 raise Exception(f"No device found with name {name}")
 
-        # Get DDC and DUC mappings
-        paths = {}
-
-        for ch in self._rxadc.channels:
-            if "label" in ch.attrs:
-                paths = _map_to_dict(paths, ch)
-        self._path_map = paths
-
         # Get data + DDS channels
         for ch in self._rxadc.channels:
             if ch.scan_element and not ch.output:
@@ -154,26 +138,6 @@ class ad9084(rx_tx, context_manager, sync_start):
         self._dds_channel_names = _sortconv(self._dds_channel_names, dds=True)
         self._dds2_channel_names = _sortconv(self._dds2_channel_names, dds=True)
 
-        # Map unique attributes to channel properties
-        self._rx_fine_ddc_channel_names = []
-        self._rx_coarse_ddc_channel_names = []
-        self._tx_fine_duc_channel_names = []
-        self._tx_coarse_duc_channel_names = []
-
-        for side in paths:
-            for converter in paths[side]:
-                for cdc in paths[side][converter]:
-                    channels = []
-                    for fdc in paths[side][converter][cdc]:
-                        channels += paths[side][converter][cdc][fdc]["channels"]
-                    channels = [name for name in channels if "_i" in name]
-                    if "ADC" in converter:
-                        self._rx_coarse_ddc_channel_names.append(channels[0])
-                        self._rx_fine_ddc_channel_names += channels
-                    else:
-                        self._tx_coarse_duc_channel_names.append(channels[0])
-                        self._tx_fine_duc_channel_names += channels
-
         # Setup second DMA path
         self._rx2 = obs(self._ctx, self._rxadc2, self._rx2_channel_names)
         setattr(ad9084, "rx1", rx1)
@@ -190,6 +154,56 @@ class ad9084(rx_tx, context_manager, sync_start):
         sync_start.__init__(self)
         self.rx_buffer_size = 2 ** 16
 
+    # DDC and DUC mappings require reading the label of every channel, so they
+    # are only built when a channelizer property is first used
+    @cached_property
+    def _path_map(self) -> Dict[str, Dict[str, Dict[str, List[str]]]]:
+        paths = {}
+        for ch in self._rxadc.channels:
+            if "label" in ch.attrs:
+                paths = _map_to_dict(paths, ch)
+        return paths
+
+    @cached_property
+    def _channelizer_channel_names(self):
+        """Map unique attributes to channel properties
+
+        Returns:
+            tuple: Coarse DDC, fine DDC, coarse DUC and fine DUC channel names
+        """
+        rx_coarse, rx_fine, tx_coarse, tx_fine = [], [], [], []
+        paths = self._path_map
+        for side in paths:
+            for converter in paths[side]:
+                for cdc in paths[side][converter]:
+                    channels = []
+                    for fdc in paths[side][converter][cdc]:
+                        channels += paths[side][converter][cdc][fdc]["channels"]
+                    channels = [name for name in channels if "_i" in name]
+                    if "ADC" in converter:
+                        rx_coarse.append(channels[0])
+                        rx_fine += channels
+                    else:
+                        tx_coarse.append(channels[0])
+                        tx_fine += channels
+        return rx_coarse, rx_fine, tx_coarse, tx_fine
+
+    @cached_property
+    def _rx_coarse_ddc_channel_names(self) -> List[str]:
+        return self._channelizer_channel_names[0]
+
+    @cached_property
+    def _rx_fine_ddc_channel_names(self) -> List[str]:
+        return self._channelizer_channel_names[1]
+
+    @cached_property
+    def _tx_coarse_duc_channel_names(self) -> List[str]:
+        return self._channelizer_channel_names[2]
+
+    @cached_property
+    def _tx_fine_duc_channel_names(self) -> List[str]:
+        return self._channelizer_channel_names[3]
+
     def _get_iio_attr_str_single(self, channel_name, attr, output):
         # This is overridden by subclasses
         return self._get_iio_attr_str(channel_name, attr, output)
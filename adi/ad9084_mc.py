@@ -2,6 +2,7 @@
 #
 # SPDX short identifier: ADIBSD
 
+from functools import cached_property
 from typing import Dict, List
 
 from adi.ad9084 import ad9084
@@ -14,9 +15,10 @@ from adi.sync_start import sync_start
 
 
 def _map_to_dict(paths, ch, dev_name):
-    if "->" not in ch.attrs["label"].value:
+    label = ch.attrs["label"].value
+    if "->" not in label:
         return paths, False
-    side, fddc, cddc, adc = ch.attrs["label"].value.replace(":", "->").split("->")
+    side, fddc, cddc, adc = label.replace(":", "->").split("->")
     if dev_name not in paths.keys():
         paths[dev_name] = {}
     if side not in paths[dev_name].keys():
@@ -92,24 +94,14 @@ class ad9084_mc(ad9084):
     _rx_channel_names: List[str] = []
     _tx_channel_names: List[str] = []
     _tx_control_channel_names: List[str] = []
-    _rx_coarse_ddc_channel_names: List[str] = []
-    _tx_coarse_duc_channel_names: List[str] = []
-    _rx_fine_ddc_channel_names: List[str] = []
-    _tx_fine_duc_channel_names: List[str] = []
     _dds_channel_names: List[str] = []
     _device_name = ""
 
-    _path_map: Dict[str, Dict[str, Dict[str, List[str]]]] = {}
-
     def __init__(self, uri="", phy_dev_name=""):
 
         # Reset class variables
         self._tx_channel_names: List[str] = []
         self._tx_control_channel_names: List[str] = []
-        self._rx_coarse_ddc_channel_names: List[str] = []
-        self._tx_coarse_duc_channel_names: List[str] = []
-        self._rx_fine_ddc_channel_names: List[str] = []
-        self._tx_fine_duc_channel_names: List[str] = []
         self._dds_channel_names: List[str] = []
         self._rx_channel_names: List[str] = []
 
@@ -125,6 +117,8 @@ class ad9084_mc(ad9084):
             phy_dev_name = max(channel_attr_count, key=channel_attr_count.get)
 
         self._ctrl = self._ctx.find_device(phy_dev_name)
+        # Devices found by name, see _find_ctrl
+        self._ctrls_by_name = {}
         if not self._ctrl:
             raise Exception("phy_dev_name not found with name: {}".format(phy_dev_name))
 
@@ -132,24 +126,6 @@ class ad9084_mc(ad9084):
         self._txdac = _find_dev_with_buffers(self._ctx, True, "axi-ad9084")
         self._rxadc = _find_dev_with_buffers(self._ctx, False, "axi-ad9084")
 
-        # Get DDC and DUC mappings
-        # Labels span all devices so they must all be processed
-        paths = {}
-        self._default_ctrl_names = []
-        for dev in self._ctx.devices:
-            if dev.name and "ad9084" not in dev.name:
-                continue
-            for ch in dev.channels:
-                not_buffer = False
-                if "label" in ch.attrs:
-                    paths, not_buffer = _map_to_dict(paths, ch, dev.name)
-                if not_buffer and dev.name not in self._default_ctrl_names:
-                    self._default_ctrl_names.append(dev.name)
-
-        self._default_ctrl_names = sorted(self._default_ctrl_names)
-        self._ctrls = [self._ctx.find_device(dn) for dn in self._default_ctrl_names]
-        self._path_map = paths
-
         # Get data + DDS channels
         for ch in self._rxadc.channels:
             if ch.scan_element and not ch.output:
@@ -165,19 +141,61 @@ class ad9084_mc(ad9084):
         self._tx_channel_names = _sortconv(self._tx_channel_names)
         self._dds_channel_names = _sortconv(self._dds_channel_names, dds=True)
 
-        # Map unique attributes to channel properties
-        self._map_unique(paths)
-
         # Bring up DMA and DDS interfaces
         rx_tx.__init__(self)
         sync_start.__init__(self)
         self.rx_buffer_size = 2 ** 16
 
-    def _map_unique(self, paths):
-        self._rx_fine_ddc_channel_names = {}
-        self._rx_coarse_ddc_channel_names = {}
-        self._tx_fine_duc_channel_names = {}
-        self._tx_coarse_duc_channel_names = {}
+    @cached_property
+    def _channel_labels(self):
+        """Get DDC and DUC mappings, built on first use of a channelizer property
+
+        Labels span all devices so they must all be processed
+
+        Returns:
+            tuple: Path map and sorted names of devices with channelizers
+        """
+        paths = {}
+        ctrl_names = []
+        for dev in self._ctx.devices:
+            if dev.name and "ad9084" not in dev.name:
+                continue
+            for ch in dev.channels:
+                not_buffer = False
+                if "label" in ch.attrs:
+                    paths, not_buffer = _map_to_dict(paths, ch, dev.name)
+                if not_buffer and dev.name not in ctrl_names:
+                    ctrl_names.append(dev.name)
+        return paths, sorted(ctrl_names)
+
+    @cached_property
+    def _path_map(self) -> Dict[str, Dict[str, Dict[str, List[str]]]]:
+        return self._channel_labels[0]
+
+    @cached_property
+    def _default_ctrl_names(self) -> List[str]:
+        return self._channel_labels[1]
+
+    @cached_property
+    def _ctrls(self):
+        return [self._ctx.find_device(dn) for dn in self._default_ctrl_names]
+
+    def _find_ctrl(self, name):
+        """Find a device by name once, since each lookup returns a new object"""
+        ctrl = self._ctrls_by_name.get(name)
+        if ctrl is None:
+            ctrl = self._ctrls_by_name[name] = self._ctx.find_device(name)
+        return ctrl
+
+    @cached_property
+    def _channelizer_channel_names(self):
+        """Map unique attributes to channel properties per device
+
+        Returns:
+            tuple: Coarse DDC, fine DDC, coarse DUC and fine DUC channel names
+        """
+        rx_coarse, rx_fine, tx_coarse, tx_fine = {}, {}, {}, {}
+        paths = self._path_map
         for chip in paths:
             for side in paths[chip]:
                 for converter in paths[chip][side]:
@@ -190,21 +208,22 @@ class ad9084_mc(ad9084):
                         channels = [name for name in channels if "_i" in name]
 
                         if "ADC" in converter:
-                            if chip not in self._rx_coarse_ddc_channel_names.keys():
-                                self._rx_coarse_ddc_channel_names[chip] = []
-                            if chip not in self._rx_fine_ddc_channel_names.keys():
-                                self._rx_fine_ddc_channel_names[chip] = []
+                            if chip not in rx_coarse.keys():
+                                rx_coarse[chip] = []
+                            if chip not in rx_fine.keys():
+                                rx_fine[chip] = []
 
-                            self._rx_coarse_ddc_channel_names[chip].append(channels[0])
-                            self._rx_fine_ddc_channel_names[chip] += channels
+                            rx_coarse[chip].append(channels[0])
+                            rx_fine[chip] += channels
                         else:
-                            if chip not in self._tx_coarse_duc_channel_names.keys():
-                                self._tx_coarse_duc_channel_names[chip] = []
-                            if chip not in self._tx_fine_duc_channel_names.keys():
-                                self._tx_fine_duc_channel_names[chip] = []
+                            if chip not in tx_coarse.keys():
+                                tx_coarse[chip] = []
+                            if chip not in tx_fine.keys():
+                                tx_fine[chip] = []
 
-                            self._tx_coarse_duc_channel_names[chip].append(channels[0])
-                            self._tx_fine_duc_channel_names[chip] += channels
+                            tx_coarse[chip].append(channels[0])
+                            tx_fine[chip] += channels
+        return rx_coarse, rx_fine, tx_coarse, tx_fine
 
     def _map_inputs_to_dict(self, channel_names_dict, attr, output, values):
         if not isinstance(values, dict):
@@ -238,7 +257,7 @@ class ad9084_mc(ad9084):
     def _get_iio_attr_vec(self, channel_names_dict, attr, output):
         return {
             dev: ad9084._get_iio_attr_vec(
-                self, channel_names_dict[dev], attr, output, self._ctx.find_device(dev),
+                self, channel_names_dict[dev], attr, output, self._find_ctrl(dev),
             )
             for dev in channel_names_dict
         }
@@ -252,7 +271,7 @@ class ad9084_mc(ad9084):
                 attr,
                 output,
                 values[dev],
-                self._ctx.find_device(dev),
+                self._find_ctrl(dev),
             )
 
     def _set_iio_attr_float_vec(self, channel_names_dict, attr, output, values):
@@ -264,7 +283,7 @@ class ad9084_mc(ad9084):
                 attr,
                 output,
                 values[dev],
-                self._ctx.find_device(dev),
+                self._find_ctrl(dev),
             )
 
     def _set_iio_attr_str_vec(self, channel_names_dict, attr, output, values):
@@ -276,7 +295,7 @@ class ad9084_mc(ad9084):
                 attr,
                 output,
                 values[dev],
-                self._ctx.find_device(dev),
+                self._find_ctrl(dev),
             )
 
     # Singleton function intercepts
@@ -284,7 +303,7 @@ class ad9084_mc(ad9084):
         channel_names_dict = self._rx_coarse_ddc_channel_names
         return {
             dev: attribute._get_iio_attr_str(
-                self, channel_name, attr, output, self._ctx.find_device(dev)
+                self, channel_name, attr, output, self._find_ctrl(dev)
             )
             for dev in channel_names_dict
         }
@@ -293,7 +312,7 @@ class ad9084_mc(ad9084):
         channel_names_dict = self._rx_coarse_ddc_channel_names
         return {
             dev: attribute._get_iio_attr(
-                self, channel_name, attr, output, self._ctx.find_device(dev)
+                self, channel_name, attr, output, self._find_ctrl(dev)
             )
             for dev in channel_names_dict
         }
@@ -303,13 +322,13 @@ class ad9084_mc(ad9084):
         values = self._map_inputs_to_dict_single(channel_names_dict, values)
         for dev in channel_names_dict:
             self._set_iio_attr(
-                channel_name, attr, output, values[dev], self._ctx.find_device(dev)
+                channel_name, attr, output, values[dev], self._find_ctrl(dev)
             )
 
     def _get_iio_dev_attr_single(self, attr):
         channel_names_dict = self._rx_coarse_ddc_channel_names
         return {
-            dev: attribute._get_iio_dev_attr(self, attr, self._ctx.find_device(dev))
+            dev: attribute._get_iio_dev_attr(self, attr, self._find_ctrl(dev))
             for dev in channel_names_dict
         }
 
@@ -317,7 +336,7 @@ class ad9084_mc(ad9084):
         channel_names_dict = self._rx_coarse_ddc_channel_names
         values = self._map_inputs_to_dict_single(channel_names_dict, values)
         for dev in channel_names_dict:
-            self._set_iio_dev_attr(attr, values[dev], self._ctx.find_device(dev))
+            self._set_iio_dev_attr(attr, values[dev], self._find_ctrl(dev))
 
 
 class Triton(ad9084_mc):
@@ -18,6 +18,12 @@ class ad9364(rx_tx_def, context_manager):
     _rx_data_device_name = "cf-ad9361-lpc"
     _tx_data_device_name = "cf-ad9361-dds-core-lpc"
     _device_name = ""
+    _attr_schema = {
+        "frequency": int,
+        "rf_bandwidth": int,
+        "sampling_frequency": int,
+        "voltage_filter_fir_en": int,
+    }
 
     @property
     def filter(self):
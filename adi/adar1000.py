@@ -2,7 +2,7 @@
 #
 # SPDX short identifier: ADIBSD
 
-from math import pi, sin
+import numpy as np
 
 from adi.attribute import attribute
 from adi.context_manager import context_manager
@@ -65,6 +65,8 @@ class adar1000(attribute, context_manager):
     """
 
     _device_name = ""
+    # CHX_RAM_BYPASS bits of MEM_CTRL (0x38) keeping a direction under SPI control
+    _chx_ram_bypass = {"rx": 0x01, "tx": 0x02}
     _BIAS_CODE_TO_VOLTAGE_SCALE = -0.018824
 
     class adar1000_channel:
@@ -400,6 +402,8 @@ class adar1000(attribute, context_manager):
         self._ctrl = None
         self._chip_id = chip_id
         self._array_device_number = device_number
+        # Beam memory control of each direction as last set by adar1000_array
+        self._beam_mem_modes = {}
 
         # Check for the presence of array and channel element maps
         if array_element_map is None:
@@ -464,6 +468,7 @@ class adar1000(attribute, context_manager):
     @beam_mem_enable.setter
     def beam_mem_enable(self, value):
         """ Get/Set enable bit for RAM control vs. SPI control of the beam state """
+        self._beam_mem_modes.clear()
         self._set_iio_dev_attr_str("beam_mem_enable", int(value), self._ctrl)
 
     @property
@@ -560,7 +565,8 @@ class adar1000(attribute, context_manager):
         Get/Set the CHX_RAM_BYPASS bits to use either a common beam state for all channels set by registers 0x39
         and 0x3A, or individual beam states set by registers 0x3D to 0x44.
         """
-        self._set_iio_dev_attr_str("bias_enable", int(value), self._ctrl)
+        self._beam_mem_modes.clear()
+        self._set_iio_dev_attr_str("common_mem_enable", int(value), self._ctrl)
 
     @property
     def common_rx_beam_state(self):
@@ -1135,6 +1141,44 @@ class adar1000(attribute, context_manager):
         self.latch_rx_settings()
         self.latch_tx_settings()
 
+    def _set_channel_attrs(self, attr, output, values):
+        """Write an attribute of all four channels, in channel order"""
+        for channel, value in zip(self._channels, values):
+            self._set_iio_attr(
+                f"voltage{channel.adar1000_channel}", attr, output, value
+            )
+
+    def _set_beam_mem_mode(self, rx_or_tx, enable):
+        """Switch the Rx or Tx beam between the beam memory and SPI control,
+        skipping the writes if already set
+
+        A direction is kept under SPI control by its CHX_RAM_BYPASS bit in
+        MEM_CTRL (0x38), so switching one direction leaves the source of the
+        other one unchanged. The beam memory is enabled the first time a
+        direction uses it, with the other direction kept under SPI control.
+        """
+        if self._beam_mem_modes.get(rx_or_tx) == enable:
+            return
+        other = "tx" if rx_or_tx == "rx" else "rx"
+        mem_on = any(self._beam_mem_modes.values()) or bool(
+            self._get_iio_dev_attr("beam_mem_enable", self._ctrl)
+        )
+        mem_ctrl = self._ctrl.reg_read(0x38)
+        value = mem_ctrl
+        if enable:
+            value &= ~self._chx_ram_bypass[rx_or_tx]
+            if not mem_on:
+                value |= self._chx_ram_bypass[other]
+                self._beam_mem_modes[other] = False
+        else:
+            value |= self._chx_ram_bypass[rx_or_tx]
+        if value != mem_ctrl:
+            self._ctrl.reg_write(0x38, value)
+            self._attr_invalidate(self._ctrl)
+        if enable and not mem_on:
+            self._set_iio_dev_attr_str("beam_mem_enable", 1, self._ctrl)
+        self._beam_mem_modes[rx_or_tx] = enable
+
     def latch_rx_settings(self):
         """ Latch in new Gain/Phase settings for the Rx """
         self._set_iio_dev_attr_str("rx_load_spi", 1, self._ctrl)
@@ -1145,6 +1189,7 @@ class adar1000(attribute, context_manager):
 
     def reset(self):
         """ Reset ADAR1000 to default settings """
+        self._beam_mem_modes.clear()
         self._set_iio_dev_attr("reset", 1, self._ctrl)
 
     def save_rx_bias(
@@ -1329,6 +1374,15 @@ class adar1000_array(context_manager):
                 f"Couldn't find all devices in the array {', '.join(chip_ids)}"
             )
 
+        # Rows and columns of the elements of each device in channel order, so
+        # settings for the whole array are computed at once
+        self._device_rows = np.array(
+            [[ch.row for ch in dev.channels] for dev in self._devices.values()]
+        )
+        self._device_columns = np.array(
+            [[ch.column for ch in dev.channels] for dev in self._devices.values()]
+        )
+
         # Initialize some class fields
         self._chip_ids = chip_ids
         self._device_map = device_map
@@ -1343,6 +1397,7 @@ class adar1000_array(context_manager):
         self._tx_azimuth_phi = 0
         self._tx_elevation = 0
         self._tx_elevation_phi = 0
+        self._beam_tables = {"rx": [], "tx": []}
 
     def __repr__(self):
         """ Representation of the ADAR1000 array class """
@@ -1356,10 +1411,11 @@ class adar1000_array(context_manager):
         The format is a list of lists where each row in the
         array is a list entry in the larger list."""
         attenuator_map = []
+        elements = self.elements
         for r, row in enumerate(self.element_map):
             attenuator_map.append([])
             for element in row:
-                attenuator_map[r].append(self.elements[element].rx_attenuator)
+                attenuator_map[r].append(elements[element].rx_attenuator)
 
         return attenuator_map
 
@@ -1368,9 +1424,10 @@ class adar1000_array(context_manager):
         """Get/Set all Rx Attenuator settings in the array.
         The format is a list of lists where each row in the
         array is a list entry in the larger list."""
+        elements = self.elements
         for r, row in enumerate(self.element_map):
             for e, element in enumerate(row):
-                self.elements[element].rx_attenuator = value[r][e]
+                elements[element].rx_attenuator = value[r][e]
 
     @property
     def all_rx_gains(self):
@@ -1378,10 +1435,11 @@ class adar1000_array(context_manager):
         The format is a list of lists where each row in the
         array is a list entry in the larger list."""
         gain_map = []
+        elements = self.elements
         for r, row in enumerate(self.element_map):
             gain_map.append([])
             for element in row:
-                gain_map[r].append(self.elements[element].rx_gain)
+                gain_map[r].append(elements[element].rx_gain)
 
         return gain_map
 
@@ -1390,9 +1448,7 @@ class adar1000_array(context_manager):
         """Get/Set all Rx Gain settings in the array.
         The format is a list of lists where each row in the
         array is a list entry in the larger list."""
-        for r, row in enumerate(self.element_map):
-            for e, element in enumerate(row):
-                self.elements[element].rx_gain = value[r][e]
+        self._set_element_attrs("hardwaregain", False, value)
 
     @property
     def all_rx_phases(self):
@@ -1400,10 +1456,11 @@ class adar1000_array(context_manager):
         The format is a list of lists where each row in the
         array is a list entry in the larger list."""
         phase_map = []
+        elements = self.elements
         for r, row in enumerate(self.element_map):
             phase_map.append([])
             for element in row:
-                phase_map[r].append(self.elements[element].rx_phase)
+                phase_map[r].append(elements[element].rx_phase)
 
         return phase_map
 
@@ -1412,9 +1469,7 @@ class adar1000_array(context_manager):
         """Get/Set all Rx Phase settings in the array.
         The format is a list of lists where each row in the
         array is a list entry in the larger list."""
-        for r, row in enumerate(self.element_map):
-            for e, element in enumerate(row):
-                self.elements[element].rx_phase = value[r][e]
+        self._set_element_attrs("phase", False, value)
 
     @property
     def all_tx_attenuators(self):
@@ -1422,10 +1477,11 @@ class adar1000_array(context_manager):
         The format is a list of lists where each row in the
         array is a list entry in the larger list."""
         attenuator_map = []
+        elements = self.elements
         for r, row in enumerate(self.element_map):
             attenuator_map.append([])
             for element in row:
-                attenuator_map[r].append(self.elements[element].tx_attenuator)
+                attenuator_map[r].append(elements[element].tx_attenuator)
 
         return attenuator_map
 
@@ -1434,9 +1490,10 @@ class adar1000_array(context_manager):
         """Get/Set all Tx Attenuator settings in the array.
         The format is a list of lists where each row in the
         array is a list entry in the larger list."""
+        elements = self.elements
         for r, row in enumerate(self.element_map):
             for e, element in enumerate(row):
-                self.elements[element].tx_attenuator = value[r][e]
+                elements[element].tx_attenuator = value[r][e]
 
     @property
     def all_tx_gains(self):
@@ -1444,10 +1501,11 @@ class adar1000_array(context_manager):
         The format is a list of lists where each row in the
         array is a list entry in the larger list."""
         gain_map = []
+        elements = self.elements
         for r, row in enumerate(self.element_map):
             gain_map.append([])
             for element in row:
-                gain_map[r].append(self.elements[element].tx_gain)
+                gain_map[r].append(elements[element].tx_gain)
 
         return gain_map
 
@@ -1456,9 +1514,7 @@ class adar1000_array(context_manager):
         """Get/Set all Tx Gain settings in the array.
         The format is a list of lists where each row in the
         array is a list entry in the larger list."""
-        for r, row in enumerate(self.element_map):
-            for e, element in enumerate(row):
-                self.elements[element].tx_gain = value[r][e]
+        self._set_element_attrs("hardwaregain", True, value)
 
     @property
     def all_tx_phases(self):
@@ -1466,10 +1522,11 @@ class adar1000_array(context_manager):
         The format is a list of lists where each row in the
         array is a list entry in the larger list."""
         phase_map = []
+        elements = self.elements
         for r, row in enumerate(self.element_map):
             phase_map.append([])
             for element in row:
-                phase_map[r].append(self.elements[element].tx_phase)
+                phase_map[r].append(elements[element].tx_phase)
 
         return phase_map
 
@@ -1478,9 +1535,7 @@ class adar1000_array(context_manager):
         """Get/Set all Tx Phase settings in the array.
         The format is a list of lists where each row in the
         array is a list entry in the larger list."""
-        for r, row in enumerate(self.element_map):
-            for e, element in enumerate(row):
-                self.elements[element].tx_phase = value[r][e]
+        self._set_element_attrs("phase", True, value)
 
     @property
     def devices(self):
@@ -1596,6 +1651,26 @@ class adar1000_array(context_manager):
         azimuth_phi, elevation_phi = self.calculate_phi(azimuth, elevation)
 
         # Update the class variables
+        self._set_beam_angles(rx_or_tx, azimuth, elevation, azimuth_phi, elevation_phi)
+
+        # Phases written over SPI only apply to a direction under SPI control
+        self._set_beam_mem(rx_or_tx, False)
+
+        # Steer the elements in the array, computing the phases of all devices
+        phases = self._device_columns * azimuth_phi + self._device_rows * elevation_phi
+        for device, device_phases in zip(self._devices.values(), phases.tolist()):
+            device._set_channel_attrs("phase", rx_or_tx != "rx", device_phases)
+
+        # Latch in the new phases
+        if rx_or_tx == "rx":
+            self.latch_rx_settings()
+        else:
+            self.latch_tx_settings()
+
+    def _set_beam_angles(
+        self, rx_or_tx, azimuth, elevation, azimuth_phi, elevation_phi
+    ):
+        """Update the angles the Rx or Tx array is steered to"""
         if rx_or_tx == "rx":
             self._rx_azimuth = azimuth
             self._rx_elevation = elevation
@@ -1607,22 +1682,42 @@ class adar1000_array(context_manager):
             self._tx_azimuth_phi = azimuth_phi
             self._tx_elevation_phi = elevation_phi
 
-        # Steer the elements in the array
-        for element in self.elements.values():
-            # Calculate the row and column phases
-            column_phase = element.column * azimuth_phi
-            row_phase = element.row * elevation_phi
+    def _set_beam_mem(self, rx_or_tx, enable):
+        """Switch the Rx or Tx beam of all devices between beam memory and SPI control"""
+        rx_or_tx = "rx" if rx_or_tx == "rx" else "tx"
+        for device in self._devices.values():
+            device._set_beam_mem_mode(rx_or_tx, enable)
 
+    def _select_beam(self, rx_or_tx, index):
+        """Point the array to a beam of the beam table
+        parameters:
+            rx_or_tx: string
+                Sets which beam table is used, Rx or Tx.
+            index: int
+                Index of the beam in the list given to load_beam_table
+        """
+        rx_or_tx = rx_or_tx.strip().lower()
+        table = self._beam_tables["rx" if rx_or_tx == "rx" else "tx"]
+        if not 0 <= index < len(table):
+            raise ValueError(
+                f"Beam {index} is not in the {rx_or_tx} beam table of {len(table)} beams"
+            )
+
+        self._set_beam_mem(rx_or_tx, True)
+        for device in self._devices.values():
             if rx_or_tx == "rx":
-                element.rx_phase = column_phase + row_phase
+                device.common_rx_beam_state = index
             else:
-                element.tx_phase = column_phase + row_phase
+                device.common_tx_beam_state = index
 
-        # Latch in the new phases
-        if rx_or_tx == "rx":
-            self.latch_rx_settings()
-        else:
-            self.latch_tx_settings()
+        self._set_beam_angles(rx_or_tx, *table[index])
+
+    def _set_element_attrs(self, attr, output, value):
+        """Write an attribute of all elements, given in the layout of element_map"""
+        for device in self._devices.values():
+            device._set_channel_attrs(
+                attr, output, [value[ch.row][ch.column] for ch in device.channels]
+            )
 
     """ Public Methods """
 
@@ -1630,20 +1725,22 @@ class adar1000_array(context_manager):
         """Calculate the Φ angles to steer the array in a particular direction. This method assumes that the entire
             array is one analog beam.
         parameters:
-            azimuth: float
+            azimuth: float or numpy.array
                 Desired beam angle in degrees for the horizontal direction.
-            elevation: float
+            elevation: float or numpy.array
                 Desired beam angle in degrees for the vertical direction.
         """
 
         # Convert the input angles to radians
-        az_rads = azimuth * pi / 180
-        el_rads = elevation * pi / 180
+        az_rads = np.asarray(azimuth) * np.pi / 180
+        el_rads = np.asarray(elevation) * np.pi / 180
 
         # Calculate the phase increment (Φ) for each element in the array in both directions (in degrees)
-        az_phi = 2 * self.frequency * self.element_spacing * sin(az_rads) * 180 / 3e8
-        el_phi = 2 * self.frequency * self.element_spacing * sin(el_rads) * 180 / 3e8
+        az_phi = 2 * self.frequency * self.element_spacing * np.sin(az_rads) * 180 / 3e8
+        el_phi = 2 * self.frequency * self.element_spacing * np.sin(el_rads) * 180 / 3e8
 
+        if np.ndim(az_phi) == 0 and np.ndim(el_phi) == 0:
+            return float(az_phi), float(el_phi)
         return az_phi, el_phi
 
     def initialize_devices(self, pa_off=-2.5, pa_on=-2.5, lna_off=-2, lna_on=-2):
@@ -1674,6 +1771,75 @@ class adar1000_array(context_manager):
         for device in self.devices.values():
             device.latch_tx_settings()
 
+    def load_beam_table(self, az_el_list, rx_or_tx="rx"):
+        """Store beam positions in the beam memory of all ADAR1000s, to switch
+        between them with select_rx_beam or select_tx_beam. Each beam uses the
+        current gain and attenuator settings of the elements.
+
+        parameters:
+            az_el_list: list[tuple[float, float]]
+                Azimuth and elevation in degrees of each beam. Beams are stored
+                in order at beam positions 0 to 120.
+            rx_or_tx: string
+                Sets which beams are stored, Rx or Tx.
+        """
+        rx_or_tx = rx_or_tx.strip().lower()
+        if len(az_el_list) > 121:
+            raise ValueError("The beam memory holds up to 121 beams")
+
+        # Calculate the phases of all elements for all beams at once
+        azimuths, elevations = np.reshape(
+            np.asarray(az_el_list, dtype=float), (-1, 2)
+        ).T
+        azimuth_phis, elevation_phis = self.calculate_phi(azimuths, elevations)
+        phases = np.mod(
+            self._device_columns * azimuth_phis[:, None, None]
+            + self._device_rows * elevation_phis[:, None, None],
+            360,
+        )
+
+        for d, device in enumerate(self._devices.values()):
+            for channel, channel_phases in zip(
+                device.channels, phases[:, d].T.tolist()
+            ):
+                if rx_or_tx == "rx":
+                    gain, attenuator = channel.rx_gain, channel.rx_attenuator
+                    save = channel.save_rx_beam
+                else:
+                    gain, attenuator = channel.tx_gain, channel.tx_attenuator
+                    save = channel.save_tx_beam
+                for state, phase in enumerate(channel_phases):
+                    save(state, attenuator, gain, phase)
+
+        self._beam_tables["rx" if rx_or_tx == "rx" else "tx"] = list(
+            zip(
+                azimuths.tolist(),
+                elevations.tolist(),
+                azimuth_phis.tolist(),
+                elevation_phis.tolist(),
+            )
+        )
+
+    def select_rx_beam(self, index):
+        """Point the Rx array to a beam stored with load_beam_table. Once the beam memory is enabled this takes a single write per ADAR1000.
+
+        parameters:
+            index: int
+                Index of the beam in the list given to load_beam_table.
+        """
+
+        self._select_beam("rx", index)
+
+    def select_tx_beam(self, index):
+        """Point the Tx array to a beam stored with load_beam_table. Once the beam memory is enabled this takes a single write per ADAR1000.
+
+        parameters:
+            index: int
+                Index of the beam in the list given to load_beam_table.
+        """
+
+        self._select_beam("tx", index)
+
     def steer_rx(self, azimuth, elevation):
         """Steer the Rx array in a particular direction. This method assumes that the entire array is one analog beam.
 
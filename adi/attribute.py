@@ -2,12 +2,128 @@
 #
 # SPDX short identifier: ADIBSD
 
+import asyncio
+import functools
+import json
+import math
 import re
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from fnmatch import fnmatch
+
+_executors = {}
+_executors_lock = threading.Lock()
+# Workers reading concurrently from a context, see _context_readers
+_readers = {}
+
+# Cached attribute reads shared by all objects, see _device_state
+_attr_cache = {}
+# Last values written to each iio device while attr_write_if_changed is
+# enabled, see _device_state
+_attr_written = {}
+
+
+def _context_executor(ctx) -> ThreadPoolExecutor:
+    """Get the executor running blocking calls for a context.
+
+    Each context gets a single worker so calls into the same context are
+    serialized, while calls into different contexts run concurrently.
+    """
+    with _executors_lock:
+        executor = _executors.get(id(ctx))
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyadi-iio")
+            _executors[id(ctx)] = executor
+            # Contexts are keyed by id since libiio objects may not be hashable
+            weakref.finalize(ctx, _executors.pop, id(ctx), None)
+        return executor
+
+
+def _context_readers(ctx, workers) -> ThreadPoolExecutor:
+    """Get an executor with at least the given number of workers for a context.
+
+    Unlike _context_executor, calls run concurrently, which only pays off for
+    contexts serving several requests at once. The executor lives as long as
+    the context and is only replaced when more workers are needed.
+    """
+    with _executors_lock:
+        entry = _readers.get(id(ctx))
+        if entry is None or entry[1] < workers:
+            if entry is None:
+                weakref.finalize(ctx, _readers.pop, id(ctx), None)
+            # A replaced executor finishes pending calls, its idle workers
+            # exit once it is no longer referenced
+            executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="pyadi-iio-rx"
+            )
+            entry = _readers[id(ctx)] = (executor, workers)
+        return entry[0]
+
+
+def _device_context(dev):
+    """Get the context of an iio device, or the device itself if unknown"""
+    ctx = getattr(dev, "ctx", None)
+    # Devices of libiio v0 only hold a weak reference to their context
+    if isinstance(ctx, weakref.ref):
+        ctx = ctx()
+    return dev if ctx is None else ctx
+
+
+def _device_state(table, dev, create=False):
+    """Get the entry of an iio device in a table of per-device state.
+
+    Tables map the id of a context to dicts keyed by device id, so all the
+    objects libiio returns for the same device share one entry. Contexts are
+    not referenced by the table and their entries are dropped with them.
+    """
+    ctx = _device_context(dev)
+    devices = table.get(id(ctx))
+    if devices is None:
+        if not create:
+            return None
+        devices = table[id(ctx)] = {}
+        weakref.finalize(ctx, table.pop, id(ctx), None)
+    state = devices.get(dev.id)
+    if state is None and create:
+        state = devices[dev.id] = {}
+    return state
+
+
+_number_re = re.compile(r"[-+]?[.]?[\d]+(?:,\d\d\d)*[\.]?\d*(?:[eE][-+]?\d+)?")
+
+
+def _parse_numbers(s):
+    """Parse a plain number or whitespace separated list of numbers.
+
+    Returns None when the string contains anything else, such as units, so
+    the caller can fall back to extracting numbers with a regex.
+    """
+    # float() accepts digit separators and special values the regex does not
+    if "_" in s:
+        return None
+    try:
+        v = [float(s)]
+    except ValueError:
+        s = s.strip()
+        # Skip values ending in units without another failed conversion
+        if not s or s[-1] not in "0123456789.]":
+            return None
+        try:
+            v = [float(i) for i in s.strip("[]").split()]
+        except ValueError:
+            return None
+    if not all(map(math.isfinite, v)):
+        return None
+    return v
 
 
 def get_numbers(s):
-    v = re.findall(r"[-+]?[.]?[\d]+(?:,\d\d\d)*[\.]?\d*(?:[eE][-+]?\d+)?", s)
-    v = [float(i) for i in v]
+    v = _parse_numbers(s)
+    if v is None:
+        v = [float(i) for i in _number_re.findall(s)]
     if len(v) == 1:
         v = v[0]
         if int(v) == v:
@@ -15,7 +131,440 @@ def get_numbers(s):
     return v
 
 
+class _attr_handle:
+    """IIO attribute of a device or channel resolved once for repeated access
+
+    Keys are ("channel", channel name, output, attribute name),
+    ("device", attribute name) or ("debug", attribute name).
+    """
+
+    __slots__ = ("dev", "attr")
+
+    def __init__(self, dev, key):
+        self.dev = dev
+        if key[0] == "channel":
+            channel = dev.find_channel(key[1], key[2])
+            if not channel:
+                raise Exception("No channel found with name: " + key[1])
+            attrs = channel.attrs
+        elif key[0] == "device":
+            attrs = dev.attrs
+        else:
+            attrs = dev.debug_attrs
+        self.attr = attrs[key[-1]]
+
+    def read(self):
+        return self.attr.value
+
+    def write(self, value):
+        self.attr.value = value
+
+
 class attribute:
+    # Incremented on every attribute write so derived values can be recached
+    _write_generation = 0
+    _attr_cache_ttl = 0
+    _attr_cache_ttls = {}
+    _attr_cache_volatile = ["raw", "*_raw", "input", "processed", "*rssi*", "*temp*"]
+    _attr_cache_hits = 0
+    _attr_cache_misses = 0
+    # Parsers of numeric attributes by IIO attribute name, one of int, float
+    # or list. Values the parser cannot handle fall back to get_numbers
+    _attr_schema = {}
+    _attr_write_if_changed = False
+    _attr_write_force = False
+    # Attributes that trigger an action on every write, even of the same value
+    _attr_write_always = [
+        "*load*",
+        "*save*",
+        "*sync*",
+        "*reset*",
+        "*trigger*",
+        "*clear*",
+        "calibrate",
+        "*calibration",
+        "single_point_calib",
+        "initialize",
+        "sequence_*",
+    ]
+    _attr_writes = 0
+    _attr_writes_suppressed = 0
+    __attr_handles = None
+
+    @property
+    def attr_cache_ttl(self) -> float:
+        """attr_cache_ttl: Time in seconds attribute reads are cached for
+
+        When non-zero, values read by properties of this object are reused
+        until they are older than this time, instead of being read from
+        hardware again. Writes through pyadi-iio invalidate all cached values
+        of the written device. Set to 0 (default) to disable caching.
+        """
+        return self._attr_cache_ttl
+
+    @attr_cache_ttl.setter
+    def attr_cache_ttl(self, value: float):
+        """attr_cache_ttl: Time in seconds attribute reads are cached for"""
+        if value < 0:
+            raise Exception("attr_cache_ttl must not be negative")
+        self._attr_cache_ttl = value
+
+    @property
+    def attr_cache_ttls(self) -> dict:
+        """attr_cache_ttls: Cache times in seconds for specific attributes
+
+        Dictionary of IIO attribute names to cache times that override
+        attr_cache_ttl. Use 0 to never cache an attribute.
+        """
+        # Copy the class default so changes in place only apply to this object
+        if "_attr_cache_ttls" not in vars(self):
+            self._attr_cache_ttls = dict(self._attr_cache_ttls)
+        return self._attr_cache_ttls
+
+    @attr_cache_ttls.setter
+    def attr_cache_ttls(self, value: dict):
+        """attr_cache_ttls: Cache times in seconds for specific attributes"""
+        if not isinstance(value, dict):
+            raise Exception("attr_cache_ttls must be a dict")
+        self._attr_cache_ttls = dict(value)
+
+    @property
+    def attr_cache_volatile(self) -> list:
+        """attr_cache_volatile: Patterns of attributes that are never cached
+
+        List of shell style patterns matched against IIO attribute and
+        channel names. Attributes that change on their own, such as raw
+        samples and temperatures, are volatile by default. Entries in
+        attr_cache_ttls take precedence.
+        """
+        if "_attr_cache_volatile" not in vars(self):
+            self._attr_cache_volatile = list(self._attr_cache_volatile)
+        return self._attr_cache_volatile
+
+    @attr_cache_volatile.setter
+    def attr_cache_volatile(self, value: list):
+        """attr_cache_volatile: Patterns of attributes that are never cached"""
+        if not isinstance(value, list):
+            raise Exception("attr_cache_volatile must be a list")
+        self._attr_cache_volatile = list(value)
+
+    @property
+    def attr_cache_stats(self) -> dict:
+        """attr_cache_stats: Number of cached attribute reads of this object
+
+        Contains reads served from the cache (hits) and reads made from
+        hardware while caching was enabled (misses).
+        """
+        return {"hits": self._attr_cache_hits, "misses": self._attr_cache_misses}
+
+    def attr_cache_clear(self):
+        """Drop cached attribute values of the devices of this object"""
+        for dev in self.__devices():
+            cached = _device_state(_attr_cache, dev)
+            if cached:
+                cached.clear()
+
+    def __parse(self, attr_name, s):
+        """Parse a numeric attribute with its declared parser if it has one"""
+        kind = self._attr_schema.get(attr_name)
+        if kind is not None:
+            try:
+                if kind is list:
+                    return [float(v) for v in s.strip().strip("[]").split()]
+                return kind(s)
+            except ValueError:
+                pass
+        return get_numbers(s)
+
+    def __handle(self, dev, key):
+        """Get the resolved attribute handle of a key, resolving it once"""
+        handles = self.__attr_handles
+        if handles is None:
+            handles = self.__attr_handles = {}
+        handle_key = (dev.id,) + key
+        handle = handles.get(handle_key)
+        if handle is None:
+            handle = handles[handle_key] = _attr_handle(dev, key)
+        return handle
+
+    def __read(self, dev, key):
+        """Read an attribute through the cache when caching applies to it"""
+        if not self._attr_cache_ttl and not self._attr_cache_ttls:
+            return self.__handle(dev, key).read()
+        attr_name = key[-1]
+        channel_name = key[1] if key[0] == "channel" else None
+        if attr_name in self._attr_cache_ttls:
+            ttl = self._attr_cache_ttls[attr_name]
+        elif any(
+            fnmatch(attr_name, p) or (channel_name and fnmatch(channel_name, p))
+            for p in self._attr_cache_volatile
+        ):
+            ttl = 0
+        else:
+            ttl = self._attr_cache_ttl
+        if not ttl:
+            return self.__handle(dev, key).read()
+
+        # Entries keep the time of the read, since objects sharing them may
+        # cache the same attribute for different times
+        now = time.monotonic()
+        cached = _device_state(_attr_cache, dev, True)
+        if key in cached:
+            read_time, value = cached[key]
+            if now - read_time < ttl:
+                self._attr_cache_hits += 1
+                return value
+        self._attr_cache_misses += 1
+        value = self.__handle(dev, key).read()
+        cached[key] = (now, value)
+        return value
+
+    @property
+    def attr_write_if_changed(self) -> bool:
+        """attr_write_if_changed: Skip writes of unchanged attribute values
+
+        When enabled, writing a property with the value it was last written
+        with through pyadi-iio does not access the hardware. Values changed
+        by other programs, or as a side effect of writing a different
+        attribute, are not detected; use attr_force_writes in that case.
+        Attributes matching attr_write_always are always written.
+        """
+        return self._attr_write_if_changed
+
+    @attr_write_if_changed.setter
+    def attr_write_if_changed(self, value: bool):
+        """attr_write_if_changed: Skip writes of unchanged attribute values"""
+        self._attr_write_if_changed = bool(value)
+
+    @property
+    def attr_write_always(self) -> list:
+        """attr_write_always: Patterns of attributes that are always written
+
+        List of shell style patterns matched against IIO attribute names.
+        Writes to these attributes trigger actions such as loads,
+        synchronization or calibration and are never skipped.
+        """
+        return self._attr_write_always
+
+    @attr_write_always.setter
+    def attr_write_always(self, value: list):
+        """attr_write_always: Patterns of attributes that are always written"""
+        if not isinstance(value, list):
+            raise Exception("attr_write_always must be a list")
+        self._attr_write_always = list(value)
+
+    @property
+    def attr_write_stats(self) -> dict:
+        """attr_write_stats: Number of attribute writes of this object
+
+        Contains writes made to hardware (written) and writes skipped since
+        the value was unchanged (suppressed).
+        """
+        return {
+            "written": self._attr_writes,
+            "suppressed": self._attr_writes_suppressed,
+        }
+
+    @contextmanager
+    def attr_force_writes(self):
+        """Write all attributes to hardware within the block, even if unchanged
+
+        .. code-block:: python
+
+            with sdr.attr_force_writes():
+                sdr.rx_lo = sdr.rx_lo
+        """
+        force = self._attr_write_force
+        self._attr_write_force = True
+        try:
+            yield self
+        finally:
+            self._attr_write_force = force
+
+    def __write(self, dev, key, value):
+        """Write an attribute, skipping it if unchanged when enabled"""
+        value = str(value)
+        if not self._attr_write_if_changed:
+            self.__handle(dev, key).write(value)
+            self._attr_writes += 1
+            # Forget values recorded while enabled, they may be stale now
+            written = _device_state(_attr_written, dev)
+            if written:
+                written.pop(key, None)
+            self.__invalidate(dev)
+            return
+        written = _device_state(_attr_written, dev, True)
+        if (
+            not self._attr_write_force
+            and written.get(key) == value
+            and not any(fnmatch(key[-1], p) for p in self._attr_write_always)
+        ):
+            self._attr_writes_suppressed += 1
+            return
+        self.__handle(dev, key).write(value)
+        self._attr_writes += 1
+        written[key] = value
+        self.__invalidate(dev)
+
+    @staticmethod
+    def __invalidate(dev):
+        """Drop cached values of a device after it has been written"""
+        attribute._write_generation += 1
+        cached = _device_state(_attr_cache, dev)
+        if cached:
+            cached.clear()
+
+    def _attr_invalidate(self, dev):
+        """Forget cached and written values of a device changed by other means,
+        such as register writes"""
+        self.__invalidate(dev)
+        written = _device_state(_attr_written, dev)
+        if written:
+            written.clear()
+
+    def _run_async(self, func, *args):
+        """Run a blocking call on the executor of this object's context"""
+        ctx = getattr(self, "_ctx", None)
+        if ctx is None:
+            ctx = getattr(getattr(self, "_ctrl", None), "ctx", None) or self
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(
+            _context_executor(ctx), functools.partial(func, *args)
+        )
+
+    async def aget_attr(self, name):
+        """Get a property without blocking the event loop
+
+        Args:
+            name: Name of the property to read
+        """
+        return await self._run_async(getattr, self, name)
+
+    async def aset_attr(self, name, value):
+        """Set a property without blocking the event loop
+
+        Args:
+            name: Name of the property to write
+            value: Value to write to the property
+        """
+        await self._run_async(setattr, self, name, value)
+
+    def __devices(self, devices=None):
+        """Resolve the given devices, defaulting to all devices of the context"""
+        if devices is not None:
+            return devices
+        ctx = getattr(self, "_ctx", None)
+        if ctx is not None:
+            return list(ctx.devices)
+        return [self._ctrl]
+
+    def __snapshot_skip(self, attr_name):
+        """Check if an attribute is read-only or changes on its own"""
+        return attr_name.endswith("_available") or any(
+            fnmatch(attr_name, p) for p in self._attr_cache_volatile
+        )
+
+    def __snapshot_attrs(self, attrs):
+        """Read all configuration attributes of a device or channel"""
+        values = {}
+        for name, attr in attrs.items():
+            if self.__snapshot_skip(name):
+                continue
+            try:
+                values[name] = attr.value
+            except Exception:
+                # Write-only or currently unreadable attributes are not saved
+                continue
+        return values
+
+    def snapshot(self, filename=None, devices=None, debug=False):
+        """Read the configuration of all devices of the context
+
+        Attributes that are read-only by convention (*_available) or listed
+        in attr_cache_volatile are not included.
+
+        Args:
+            filename: Optional path of a JSON file the snapshot is written to
+            devices: List of iio devices to read. Defaults to all devices of
+                the context
+            debug: Include debug attributes
+
+        Returns:
+            dict: Snapshot that can be passed to restore, with an entry per
+            device keyed by device id
+        """
+        snap = {}
+        for dev in self.__devices(devices):
+            entry = {
+                "attrs": self.__snapshot_attrs(dev.attrs),
+                "channels": [
+                    [chan.id, chan.output, self.__snapshot_attrs(chan.attrs)]
+                    for chan in dev.channels
+                ],
+            }
+            if debug:
+                entry["debug_attrs"] = self.__snapshot_attrs(dev.debug_attrs)
+            snap[dev.id] = entry
+        if filename:
+            with open(filename, "w") as f:
+                json.dump(snap, f, separators=(",", ":"))
+        return snap
+
+    def __restore_attr(self, attrs, name, value, result):
+        """Write an attribute if it differs from the value in hardware"""
+        if name not in attrs:
+            return False
+        try:
+            if attrs[name].value == value:
+                result["skipped"] += 1
+                return False
+            attrs[name].value = value
+        except Exception:
+            result["failed"].append(name)
+            return False
+        result["written"] += 1
+        return True
+
+    def restore(self, snapshot, devices=None):
+        """Write back a configuration read by snapshot
+
+        Device attributes of each device are written before its channel
+        attributes, then debug attributes if the snapshot contains them.
+        Only attributes whose current value differs from the snapshot are
+        written.
+
+        Args:
+            snapshot: dict returned by snapshot or path of a saved snapshot
+            devices: List of iio devices to restore. Defaults to all devices
+                of the context
+
+        Returns:
+            dict: Number of attributes written and skipped as unchanged, and
+            names of attributes that failed to write
+        """
+        if isinstance(snapshot, str):
+            with open(snapshot) as f:
+                snapshot = json.load(f)
+        result = {"written": 0, "skipped": 0, "failed": []}
+        for dev in self.__devices(devices):
+            entry = snapshot.get(dev.id)
+            if entry is None:
+                continue
+            changed = False
+            for name, value in entry["attrs"].items():
+                changed |= self.__restore_attr(dev.attrs, name, value, result)
+            for chan_id, output, values in entry["channels"]:
+                chan = dev.find_channel(chan_id, output)
+                if not chan:
+                    continue
+                for name, value in values.items():
+                    changed |= self.__restore_attr(chan.attrs, name, value, result)
+            for name, value in entry.get("debug_attrs", {}).items():
+                changed |= self.__restore_attr(dev.debug_attrs, name, value, result)
+            if changed:
+                self._attr_invalidate(dev)
+        return result
+
     def _get_iio_attr_str_multi_dev(self, channel_names, attr_name, output, ctrls):
         """ Get the same channel attribute across multiple devices
             which are assumed to be strings
@@ -61,14 +610,8 @@ class attribute:
 
     def _set_iio_attr(self, channel_name, attr_name, output, value, _ctrl=None):
         """ Set channel attribute """
-        if _ctrl:
-            channel = _ctrl.find_channel(channel_name, output)
-        else:
-            channel = self._ctrl.find_channel(channel_name, output)
-        try:
-            channel.attrs[attr_name].value = str(value)
-        except Exception as ex:
-            raise ex
+        _dev = _ctrl or self._ctrl
+        self.__write(_dev, ("channel", channel_name, output, attr_name), value)
 
     def _set_iio_attr_float(self, channel_name, attr_name, output, value, _ctrl=None):
         """ Set channel attribute with float """
@@ -113,18 +656,13 @@ class attribute:
 
     def _get_iio_attr_str(self, channel_name, attr_name, output, _ctrl=None):
         """ Get channel attribute as string """
-        if _ctrl:
-            channel = _ctrl.find_channel(channel_name, output)
-        else:
-            channel = self._ctrl.find_channel(channel_name, output)
-        if not channel:
-            raise Exception("No channel found with name: " + channel_name)
-        return channel.attrs[attr_name].value
+        _dev = _ctrl or self._ctrl
+        return self.__read(_dev, ("channel", channel_name, output, attr_name))
 
     def _get_iio_attr(self, channel_name, attr_name, output, _ctrl=None):
         """ Get channel attribute as number """
-        return get_numbers(
-            self._get_iio_attr_str(channel_name, attr_name, output, _ctrl)
+        return self.__parse(
+            attr_name, self._get_iio_attr_str(channel_name, attr_name, output, _ctrl)
         )
 
     def _get_iio_attr_vec(self, channel_names, attr_name, output, _ctrl=None):
@@ -145,50 +683,28 @@ class attribute:
 
     def _set_iio_dev_attr_str(self, attr_name, value, _ctrl=None):
         """ Set device attribute with string """
-        try:
-            if _ctrl:
-                _ctrl.attrs[attr_name].value = str(value)
-            else:
-                self._ctrl.attrs[attr_name].value = str(value)
-        except Exception as ex:
-            raise ex
+        self.__write(_ctrl or self._ctrl, ("device", attr_name), value)
 
     def _get_iio_dev_attr_str(self, attr_name, _ctrl=None):
         """ Get device attribute as string """
-        if _ctrl:
-            return _ctrl.attrs[attr_name].value
-        else:
-            return self._ctrl.attrs[attr_name].value
+        return self.__read(_ctrl or self._ctrl, ("device", attr_name))
 
     def _set_iio_dev_attr(self, attr_name, value, _ctrl=None):
         """ Set device attribute """
-        _dev = _ctrl or self._ctrl
-        try:
-            _dev.attrs[attr_name].value = str(value)
-        except Exception as ex:
-            raise ex
+        self.__write(_ctrl or self._ctrl, ("device", attr_name), value)
 
     def _get_iio_dev_attr(self, attr_name, _ctrl=None):
         """ Set device attribute as number """
-        return get_numbers(self._get_iio_dev_attr_str(attr_name, _ctrl))
+        return self.__parse(attr_name, self._get_iio_dev_attr_str(attr_name, _ctrl))
 
     def _set_iio_debug_attr_str(self, attr_name, value, _ctrl=None):
         """ Set debug attribute with string """
-        try:
-            if _ctrl:
-                _ctrl.debug_attrs[attr_name].value = str(value)
-            else:
-                self._ctrl.debug_attrs[attr_name].value = str(value)
-        except Exception as ex:
-            raise ex
+        self.__write(_ctrl or self._ctrl, ("debug", attr_name), value)
 
     def _get_iio_debug_attr_str(self, attr_name, _ctrl=None):
         """ Get debug attribute as string """
-        if _ctrl:
-            return _ctrl.debug_attrs[attr_name].value
-        else:
-            return self._ctrl.debug_attrs[attr_name].value
+        return self.__read(_ctrl or self._ctrl, ("debug", attr_name))
 
     def _get_iio_debug_attr(self, attr_name, _ctrl=None):
         """ Set debug attribute as number """
-        return get_numbers(self._get_iio_debug_attr_str(attr_name, _ctrl))
+        return self.__parse(attr_name, self._get_iio_debug_attr_str(attr_name, _ctrl))
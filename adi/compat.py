@@ -15,10 +15,19 @@ def _is_libiio_v1() -> bool:
     return v[0] >= 1
 
 
+def _channel_dtype(chan: iio.Channel) -> np.dtype:
+    """Type of samples read from a channel with local type conversion."""
+    df = chan.data_format
+    fmt = ("i" if df.is_signed is True else "u") + str(df.length // 8)
+    return np.dtype(fmt)
+
+
 class compat_libiio_v1_rx:
     """Compatibility class for libiio v1.X RX."""
 
     _rx_buffer_mask = None
+    _rx_buffer_channels = None
+    _rx_buffer_dtypes = None
     _rx_stream = None
     _rx_buffer_num_blocks = 4
 
@@ -39,6 +48,8 @@ class compat_libiio_v1_rx:
                 channels.append(v)
 
         self._rx_buffer_mask.channels = channels
+        self._rx_buffer_channels = channels
+        self._rx_buffer_dtypes = [_channel_dtype(chan) for chan in channels]
 
         self._rxbuf = iio.Buffer(self._rxadc, self._rx_buffer_mask)
         self._rx_stream = iio.Stream(
@@ -47,6 +58,14 @@ class compat_libiio_v1_rx:
             samples_count=self.rx_buffer_size,
         )
 
+    def rx_destroy_buffer(self):
+        """rx_destroy_buffer: Clears RX buffer"""
+        super().rx_destroy_buffer()
+        # The next capture creates a stream with the current channels,
+        # buffer size and number of blocks
+        self._rx_stream = None
+        self._rx_buffer_mask = None
+
     def _rx_buffered_data(self):
         if not self._rx_stream:
             self._rx_init_channels()
@@ -54,15 +73,23 @@ class compat_libiio_v1_rx:
         block = next(self._rx_stream)
 
         data_channel_interleaved = []
-        for chan in self._rx_buffer_mask.channels:
+        for chan, dtype in zip(self._rx_buffer_channels, self._rx_buffer_dtypes):
             bytearray_data = chan.read(block)
-            # create format strings
-            df = chan.data_format
-            fmt = ("i" if df.is_signed is True else "u") + str(df.length // 8)
-            data_channel_interleaved.append(np.frombuffer(bytearray_data, dtype=fmt))
+            data_channel_interleaved.append(np.frombuffer(bytearray_data, dtype=dtype))
 
         return data_channel_interleaved
 
+    def _rx_buffered_block(self) -> bytearray:
+        """_rx_buffered_block: Read a single block from the RX stream
+
+        Returns:
+            Sample interleaved bytes of the block in hardware format
+        """
+        if not self._rx_stream:
+            self._rx_init_channels()
+
+        return next(self._rx_stream).read()
+
 
 class compat_libiio_v1_tx:
     """Compatibility class for libiio v1.X TX."""
@@ -103,7 +130,7 @@ class compat_libiio_v1_tx:
     def _tx_buffer_push(self, data):
         """Push data to TX buffer.
 
-        data: bytearray
+        data: memoryview of sample interleaved bytes
         """
         if self._tx_cyclic_buffer:
             self._tx_block.write(data)
@@ -117,6 +144,10 @@ class compat_libiio_v1_tx:
 class compat_libiio_v0_rx:
     """Compatibility class for libiio v0.X RX."""
 
+    _rx_buffer_channels = None
+    _rx_buffer_dtypes = None
+    _rx_buffer_num_blocks = None
+
     def _rx_init_channels(self):
         for m in self._rx_channel_names:
             v = self._rxadc.find_channel(m)
@@ -124,16 +155,24 @@ class compat_libiio_v0_rx:
                 raise Exception(f"Channel {m} not found")
             v.enabled = False
 
+        channels = []
         if self._complex_data:
             for m in self.rx_enabled_channels:
                 v = self._rxadc.find_channel(self._rx_channel_names[m * 2])
                 v.enabled = True
+                channels.append(v)
                 v = self._rxadc.find_channel(self._rx_channel_names[m * 2 + 1])
                 v.enabled = True
+                channels.append(v)
         else:
             for m in self.rx_enabled_channels:
                 v = self._rxadc.find_channel(self._rx_channel_names[m])
                 v.enabled = True
+                channels.append(v)
+        self._rx_buffer_channels = channels
+        self._rx_buffer_dtypes = [_channel_dtype(chan) for chan in channels]
+        if self._rx_buffer_num_blocks:
+            self._rxadc.set_kernel_buffers_count(self._rx_buffer_num_blocks)
         self._rxbuf = iio.Buffer(self._rxadc, self._rx_buffer_size, False)
 
     def _rx_buffered_data(self) -> Union[List[np.ndarray], np.ndarray]:
@@ -148,25 +187,24 @@ class compat_libiio_v0_rx:
         self._rxbuf.refill()
 
         data_channel_interleaved = []
-        ecn = []
-        if self._complex_data:
-            for m in self.rx_enabled_channels:
-                ecn.extend(
-                    (self._rx_channel_names[m * 2], self._rx_channel_names[m * 2 + 1])
-                )
-        else:
-            ecn = [self._rx_channel_names[m] for m in self.rx_enabled_channels]
-
-        for name in ecn:
-            chan = self._rxadc.find_channel(name)
+        for chan, dtype in zip(self._rx_buffer_channels, self._rx_buffer_dtypes):
             bytearray_data = chan.read(self._rxbuf)  # Do local type conversion
-            # create format strings
-            df = chan.data_format
-            fmt = ("i" if df.is_signed is True else "u") + str(df.length // 8)
-            data_channel_interleaved.append(np.frombuffer(bytearray_data, dtype=fmt))
+            data_channel_interleaved.append(np.frombuffer(bytearray_data, dtype=dtype))
 
         return data_channel_interleaved
 
+    def _rx_buffered_block(self) -> bytearray:
+        """_rx_buffered_block: Refill the RX buffer and read it in one transfer
+
+        Returns:
+            Sample interleaved bytes of the buffer in hardware format
+        """
+        if not self._rxbuf:
+            self._rx_init_channels()
+        self._rxbuf.refill()
+
+        return self._rxbuf.read()
+
 
 class compat_libiio_v0_tx:
     """Compatibility class for libiio v0.X TX."""
@@ -187,5 +225,5 @@ class compat_libiio_v0_tx:
         )
 
     def _tx_buffer_push(self, data):
-        self._txbuf.write(bytearray(data))
+        self._txbuf.write(data)
         self._txbuf.push()
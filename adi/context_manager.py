@@ -2,18 +2,283 @@
 #
 # SPDX short identifier: ADIBSD
 
+import errno
+import json
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import Future, TimeoutError, as_completed
+
 import iio
 
+# Contexts shared by all objects opened with the same URI
+_contexts = {}
+_contexts_lock = threading.Lock()
+_reconnects = 0
+
+# Errors of attribute reads meaning the context has lost its connection
+_disconnect_errnos = {
+    errno.EPIPE,
+    errno.ECONNRESET,
+    errno.ECONNABORTED,
+    errno.ECONNREFUSED,
+    errno.ENOTCONN,
+    errno.ETIMEDOUT,
+    errno.EHOSTUNREACH,
+    errno.ENETUNREACH,
+    errno.EBADF,
+}
+
+
+def _context_alive(ctx):
+    """Check that a context still responds by reading a device attribute"""
+    for dev in ctx.devices:
+        for attr in dev.attrs.values():
+            try:
+                attr.value
+            except OSError as ex:
+                if ex.errno in _disconnect_errnos:
+                    return False
+                # Attribute not readable, try the next one
+                continue
+            return True
+    return True
+
+
+def _rebind_context(holder, ctx):
+    """Point an object and the iio devices it holds at a reopened context"""
+    holder._ctx = ctx
+    for name, value in list(vars(holder).items()):
+        if isinstance(value, iio.Device):
+            dev = ctx.find_device(value.id)
+            if dev is not None:
+                setattr(holder, name, dev)
+        elif isinstance(value, list) and any(isinstance(v, iio.Device) for v in value):
+            devs = [
+                ctx.find_device(v.id) if isinstance(v, iio.Device) else v for v in value
+            ]
+            if None not in devs:
+                setattr(holder, name, devs)
+
+
+def _acquire_context(uri, check_interval, holder, ctx=None):
+    """Get the shared context entry of a URI, reconnecting if it stopped responding
+
+    When the shared context no longer responds it is reopened and all objects
+    holding it are moved to the new one. An already open context of the URI
+    can be passed in ctx, which is used if a context has to be opened.
+
+    Returns:
+        dict: Registry entry, released with _release_context
+    """
+    global _reconnects
+    with _contexts_lock:
+        entry = _contexts.get(uri)
+        now = time.monotonic()
+        if entry and now - entry["checked"] > check_interval:
+            entry["checked"] = now
+            if not _context_alive(entry["ctx"]):
+                entry["ctx"] = iio.Context(uri) if ctx is None else ctx
+                _reconnects += 1
+                for ref in entry["holders"]:
+                    other = ref()
+                    if other is not None:
+                        _rebind_context(other, entry["ctx"])
+        if not entry:
+            if ctx is None:
+                ctx = iio.Context(uri)
+            entry = {"ctx": ctx, "refs": 0, "checked": now, "holders": []}
+            _contexts[uri] = entry
+        entry["refs"] += 1
+        entry["holders"].append(weakref.ref(holder))
+        return entry
+
+
+def _release_context(uri, entry):
+    """Drop a reference to a shared context, closing it with the last one"""
+    with _contexts_lock:
+        entry["refs"] -= 1
+        entry["holders"] = [ref for ref in entry["holders"] if ref() is not None]
+        if entry["refs"] <= 0 and _contexts.get(uri) is entry:
+            del _contexts[uri]
+
+
+def context_stats():
+    """Report the contexts shared between objects
+
+    Returns:
+        dict: Number of open shared contexts, how many of them are network
+        contexts with their own socket, references held per URI and the
+        number of reconnects after failed health checks
+    """
+    with _contexts_lock:
+        return {
+            "contexts": len(_contexts),
+            "sockets": sum(1 for uri in _contexts if uri.startswith("ip:")),
+            "references": {uri: e["refs"] for uri, e in _contexts.items()},
+            "reconnects": _reconnects,
+        }
+
+
+# Time in seconds discovered contexts are remembered across processes
+_discovery_ttl = 300
+# Time in seconds to wait for scanned contexts to open
+_discovery_timeout = 5
+
+
+def _discovery_cache_path():
+    """Path of the file remembering discovered contexts"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "pyadi-iio", "contexts.json")
+
+
+def _load_discovery_cache():
+    """Read discovered contexts that have not expired"""
+    try:
+        with open(_discovery_cache_path()) as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    now = time.time()
+    return {
+        uri: e for uri, e in entries.items() if 0 <= now - e["time"] < _discovery_ttl
+    }
+
+
+def _save_discovery_cache(entries):
+    """Write discovered contexts, ignoring an unwritable cache directory"""
+    path = _discovery_cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = "{}.{}".format(path, os.getpid())
+        with open(tmp, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _probe_context(uri):
+    """Open a context and list the names of its devices"""
+    ctx = iio.Context(uri)
+    return ctx, [dev.name for dev in ctx.devices]
+
+
+def _probe_in_background(uri):
+    """Probe a context on a daemon thread, so a hung probe cannot block exit"""
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(_probe_context(uri))
+        except Exception as ex:
+            future.set_exception(ex)
+
+    threading.Thread(target=run, name="pyadi-iio-discovery", daemon=True).start()
+    return future
+
+
+def _discover_context(match):
+    """Find a context of a scan matching a condition
+
+    Contexts are first matched on their scan description alone. Only contexts
+    whose description cannot decide a match are opened to list their devices:
+    those found by the last scan of any process are tried first, otherwise
+    all of them are opened in parallel and the first to respond that matches
+    is used, waiting at most _discovery_timeout seconds. Devices of opened
+    contexts are cached on disk.
+
+    Args:
+        match: Function called with the scan description and list of device
+            names of a context, returning True if the context is usable. The
+            list is None before the context is opened, in which case the
+            function returns None if the description alone cannot decide
+
+    Returns:
+        tuple: URI and open context (None if the context was not opened or a
+        context of the URI is already shared), or None and None if no
+        context matched
+    """
+    for uri, entry in _load_discovery_cache().items():
+        # Contexts matched by description are taken from a fresh scan below
+        if match(entry["description"], None) is not None:
+            continue
+        if not match(entry["description"], entry["devices"]):
+            continue
+        with _contexts_lock:
+            if uri in _contexts:
+                return uri, None
+        try:
+            ctx, names = _probe_context(uri)
+            if match(entry["description"], names):
+                return uri, ctx
+        except Exception:
+            pass
+        # Cached context is gone or changed, fall back to a full scan
+        break
+
+    contexts = iio.scan_contexts()
+    ambiguous = []
+    for uri, description in contexts.items():
+        matched = match(description, None)
+        if matched:
+            return uri, None
+        if matched is None:
+            ambiguous.append(uri)
+    if not ambiguous:
+        return None, None
+
+    futures = {_probe_in_background(uri): uri for uri in ambiguous}
+    found = (None, None)
+    entries = {}
+    now = time.time()
+    try:
+        # Use the first context to respond that matches
+        for future in as_completed(futures, timeout=_discovery_timeout):
+            if future.exception():
+                continue
+            uri = futures[future]
+            ctx, names = future.result()
+            entries[uri] = {"description": contexts[uri], "devices": names, "time": now}
+            if match(contexts[uri], names):
+                found = (uri, ctx)
+                break
+    except TimeoutError:
+        # Contexts that did not respond in time are left to their threads
+        pass
+    _save_discovery_cache(entries)
+    return found
+
 
 class context_manager(object):
     _uri_auto = "ip:analog"
     _ctx = None
+    # Share one context between all objects opened with the same URI
+    _ctx_shared = False
+    # Minimum time in seconds between health checks of a shared context
+    _ctx_check_interval = 1.0
 
     @property
     def ctx(self) -> iio.Context:
         """IIO Context"""
         return self._ctx
 
+    def _open_context(self, uri, ctx=None):
+        """Open a context, sharing it with other objects using the same URI
+
+        Args:
+            uri: URI of the context
+            ctx: Already open context of the URI to use if none is shared yet
+        """
+        if not self._ctx_shared:
+            return iio.Context(uri) if ctx is None else ctx
+        entry = _acquire_context(uri, self._ctx_check_interval, self, ctx)
+        weakref.finalize(self, _release_context, uri, entry)
+        return entry["ctx"]
+
     def __init__(self, uri="", _device_name=""):
         if self._ctx:
             return
@@ -22,17 +287,17 @@ class context_manager(object):
             if self.uri == "":
                 # Try USB contexts first
                 if _device_name != "":
-                    contexts = iio.scan_contexts()
-                    for c in contexts:
-                        if _device_name in contexts[c]:
-                            self._ctx = iio.Context(c)
-                            break
+                    uri, ctx = _discover_context(
+                        lambda description, _: _device_name in description
+                    )
+                    if uri:
+                        self._ctx = self._open_context(uri, ctx)
                 # Try auto discover
                 if not self._ctx and self._uri_auto != "":
-                    self._ctx = iio.Context(self._uri_auto)
+                    self._ctx = self._open_context(self._uri_auto)
                 if not self._ctx:
                     raise Exception("No device found")
             else:
-                self._ctx = iio.Context(self.uri)
+                self._ctx = self._open_context(self.uri)
         except BaseException:
             raise Exception("No device found")
@@ -18,20 +18,20 @@ class dds(attribute):
     def __update_dds(self, attr, value):
         split_cores_indx = 0
         for indx in range(len(self._txdac.channels)):
-            chan = self._txdac.find_channel("altvoltage" + str(indx), True)
+            dev = self._txdac
+            chan = dev.find_channel("altvoltage" + str(indx), True)
             if not chan and self._split_cores:
-                chan = self._txdac_chip_b.find_channel(
-                    "altvoltage" + str(split_cores_indx), True
-                )
+                dev = self._txdac_chip_b
+                chan = dev.find_channel("altvoltage" + str(split_cores_indx), True)
                 split_cores_indx = split_cores_indx + 1
             if not chan:
                 return
             if indx >= len(value):
                 return
             if attr == "raw":
-                chan.attrs[attr].value = str(int(value[indx]))
+                self._set_iio_attr(chan.id, attr, True, int(value[indx]), dev)
             else:
-                chan.attrs[attr].value = str(value[indx])
+                self._set_iio_attr(chan.id, attr, True, value[indx], dev)
             indx = indx + 1
 
     def _read_dds(self, attr):
@@ -5,7 +5,8 @@
 """JESD Shim import to handle JESD as optional dependency"""
 
 try:
-    from .jesd_internal import jesd
+    from .jesd_internal import jesd, jesd_link_monitor
     from .sshfs import sshfs
 except ImportError:
     jesd = None
+    jesd_link_monitor = None
@@ -2,6 +2,13 @@
 #
 # SPDX short identifier: ADIBSD
 
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
 from .sshfs import sshfs
 
 
@@ -27,14 +34,12 @@ class jesd:
         for dr in self.dirs:
             if "-rx" in dr:
                 self.lanes[dr] = []
+                # List the directory once instead of probing each lane file
+                files = set(self.fs.listdir(self.rootdir + dr))
                 lanIndx = 0
-                while 1:
-                    li = "/lane{}_info".format(lanIndx)
-                    if self.fs.isfile(self.rootdir + dr + li):
-                        self.lanes[dr].append(li)
-                        lanIndx += 1
-                    else:
-                        break
+                while "lane{}_info".format(lanIndx) in files:
+                    self.lanes[dr].append("/lane{}_info".format(lanIndx))
+                    lanIndx += 1
 
     def find_jesd_dir(self):
         dirs = self.fs.listdir(self.rootdir)
@@ -44,13 +49,12 @@ class jesd:
                 self.dirs.append(dr)
 
     def decode_status(self, status):
-        status = status.replace(",", "\n")
-        status = status.split("\n")
         link_status = {}
-        for s in status:
-            if ":" in s:
-                o = s.split(":")
-                link_status[o[0].strip().replace("/", "")] = o[1].strip()
+        for s in status.replace(",", "\n").split("\n"):
+            key, sep, value = s.partition(":")
+            if sep:
+                value = value.partition(":")[0]
+                link_status[key.strip().replace("/", "")] = value.strip()
             if "Link is" in s:
                 link_status["enabled"] = s.split(" ")[-1].strip()
 
@@ -59,20 +63,230 @@ class jesd:
     def get_status(self, dr):
         return self.fs.gettext(self.rootdir + dr + "/status")
 
-    def get_dev_lane_info(self, dr):
+    def __read_many(self, paths):
+        # Files that cannot be read decode as empty, as with gettext
+        return {p: text or "" for p, text in self.fs.read_many(paths).items()}
+
+    def __lane_paths(self, dr):
         return {
-            ldir.replace("/", ""): self.decode_status(
-                self.fs.gettext(self.rootdir + dr + "/" + ldir)
-            )
+            ldir.replace("/", ""): self.rootdir + dr + "/" + ldir
             for ldir in self.lanes[dr]
         }
 
+    def get_dev_lane_info(self, dr):
+        paths = self.__lane_paths(dr)
+        texts = self.__read_many(paths.values())
+        return {lane: self.decode_status(texts[p]) for lane, p in paths.items()}
+
     def get_all_link_statuses(self):
-        statuses = dict()
-        for dr in self.dirs:
-            if "-rx" in dr:
-                statuses[dr] = self.get_dev_lane_info(dr)
-        return statuses
+        paths = {dr: self.__lane_paths(dr) for dr in self.dirs if "-rx" in dr}
+        # Read the lanes of all links at once
+        texts = self.__read_many(p for lanes in paths.values() for p in lanes.values())
+        return {
+            dr: {lane: self.decode_status(texts[p]) for lane, p in lanes.items()}
+            for dr, lanes in paths.items()
+        }
 
     def get_all_statuses(self):
-        return {dr: self.decode_status(self.get_status(dr)) for dr in self.dirs}
+        paths = {dr: self.rootdir + dr + "/status" for dr in self.dirs}
+        texts = self.__read_many(paths.values())
+        return {dr: self.decode_status(texts[p]) for dr, p in paths.items()}
+
+
+class jesd_link_monitor:
+    """JESD204 Link Health Monitor
+
+    Polls the link and lane status of one or more boards concurrently from a
+    background thread and reports changed states only. Lane errors, ILAS and
+    CGS states of every poll are kept in a ring buffer.
+
+    parameters:
+        jesds: type=dict or list[adi.jesd]
+            JESD objects to monitor, keyed by board name. Objects in a list
+            are keyed by their address
+        interval: type=float
+            Time in seconds between polls
+        history: type=int
+            Number of polls and events kept
+        callback: type=function
+            Called from the monitor thread with each event
+    """
+
+    _ilas_states = {"No": 0, "Yes": 1}
+
+    def __init__(self, jesds, interval=1.0, history=1024, callback=None):
+        if not isinstance(jesds, dict):
+            jesds = {j.address: j for j in jesds}
+        self.jesds = jesds
+        self.interval = interval
+        self.callback = callback
+        self.events = deque(maxlen=history)
+        self.lanes = [
+            (board, dr, ldir.replace("/", ""))
+            for board, j in jesds.items()
+            for dr in j.lanes
+            for ldir in j.lanes[dr]
+        ]
+        self.cgs_states = []
+        self._times = np.zeros(history)
+        # -1 marks lanes that could not be read
+        self._errors = np.full((history, len(self.lanes)), -1, dtype=np.int64)
+        self._ilas = np.full((history, len(self.lanes)), -1, dtype=np.int8)
+        self._cgs = np.full((history, len(self.lanes)), -1, dtype=np.int8)
+        self._polls = 0
+        self._states = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def __start_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(len(self.jesds), 1), thread_name_prefix="pyadi-iio-jesd"
+            )
+        return self._executor
+
+    def start(self):
+        """start: Start polling from a background thread"""
+        if self._thread is not None:
+            return
+        self.__start_executor()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.__run, name="pyadi-iio-jesd-monitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """stop: Stop the background thread and the workers reading the boards.
+        The monitor can be started or polled again afterwards.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __run(self):
+        while not self._stop.is_set():
+            start = time.monotonic()
+            self.poll()
+            self._stop.wait(max(0, self.interval - (time.monotonic() - start)))
+
+    @staticmethod
+    def __read(j):
+        return j.get_all_statuses(), j.get_all_link_statuses()
+
+    def poll(self):
+        """poll: Read all boards once
+
+        returns: type=list[dict]
+            Events of the states that changed since the last poll. Each event
+            holds the time, board, link, lane (None for link fields), field
+            and the old and new value. The first poll sets the initial states
+            without events. Failed polls are reported in the "poll" field of
+            the board and keep the last known states.
+        """
+        now = time.time()
+        executor = self.__start_executor()
+        futures = {
+            board: executor.submit(self.__read, j) for board, j in self.jesds.items()
+        }
+        states = {}
+        for board, future in futures.items():
+            try:
+                statuses, link_statuses = future.result()
+            except Exception as ex:
+                states[(board, None, None)] = {"poll": str(ex)}
+                continue
+            states[(board, None, None)] = {"poll": "ok"}
+            for dr, status in statuses.items():
+                states[(board, dr, None)] = status
+            for dr, lanes in link_statuses.items():
+                for lane, status in lanes.items():
+                    states[(board, dr, lane)] = status
+
+        with self._lock:
+            events = []
+            for key, status in states.items():
+                last = self._states.setdefault(key, {})
+                for field, value in status.items():
+                    old = last.get(field)
+                    if old != value and self._polls:
+                        board, dr, lane = key
+                        events.append(
+                            {
+                                "time": now,
+                                "board": board,
+                                "link": dr,
+                                "lane": lane,
+                                "field": field,
+                                "old": old,
+                                "new": value,
+                            }
+                        )
+                    last[field] = value
+            self.__record(now, states)
+            self.events.extend(events)
+
+        if self.callback:
+            for event in events:
+                self.callback(event)
+        return events
+
+    def __record(self, now, states):
+        row = self._polls % len(self._times)
+        self._times[row] = now
+        for i, key in enumerate(self.lanes):
+            status = states.get(key, {})
+            errors = status.get("Errors", "")
+            self._errors[row, i] = int(errors) if errors.isdigit() else -1
+            self._ilas[row, i] = self._ilas_states.get(
+                status.get("Initial Lane Alignment Sequence"), -1
+            )
+            cgs = status.get("CGS state")
+            if cgs is None:
+                self._cgs[row, i] = -1
+            else:
+                if cgs not in self.cgs_states:
+                    self.cgs_states.append(cgs)
+                self._cgs[row, i] = self.cgs_states.index(cgs)
+        self._polls += 1
+
+    @property
+    def states(self):
+        """states: Last known fields of each (board, link, lane), with lane
+        None for link fields and link None for the poll result of a board"""
+        with self._lock:
+            return {key: dict(status) for key, status in self._states.items()}
+
+    def lane_history(self):
+        """lane_history: Lane states of the polls kept, oldest first
+
+        returns: type=dict
+            time: Time of each poll
+            errors: Error count of each poll and lane, -1 if unknown
+            ilas: 1 if initial lane alignment succeeded, 0 if not, -1 if
+            unknown
+            cgs: Index of the CGS state in cgs_states, -1 if unknown
+            Columns follow the (board, link, lane) tuples in lanes
+        """
+        with self._lock:
+            count = min(self._polls, len(self._times))
+            rows = np.arange(self._polls - count, self._polls) % len(self._times)
+            return {
+                "time": self._times[rows],
+                "errors": self._errors[rows],
+                "ilas": self._ilas[rows],
+                "cgs": self._cgs[rows],
+            }
@@ -2,15 +2,21 @@
 #
 # SPDX short identifier: ADIBSD
 
+import hashlib
+import queue
+import threading
+import time
 from abc import ABCMeta, abstractmethod
-from typing import List, Union
+from collections import OrderedDict
+from concurrent.futures import wait
+from typing import Callable, List, Union
 
 import iio
 import numpy as np
 
 import adi.compat as cl
-from adi.attribute import attribute
-from adi.context_manager import context_manager
+from adi.attribute import _context_readers, _device_context, attribute, get_numbers
+from adi.context_manager import _discover_context, context_manager
 from adi.dds import dds
 
 if cl._is_libiio_v1():
@@ -35,6 +41,155 @@ def are_channels_complex(channels: Union[List[str], List[iio.Channel]]) -> bool:
     return False
 
 
+def _serves_concurrently(ctx) -> bool:
+    """Check if a context serves requests from several threads at once.
+
+    The network and USB backends of libiio v1 keep several requests in flight
+    on one connection. libiio v0 serializes the requests of a context and
+    local reads have no round trip to overlap, so threads only add overhead.
+    """
+    return cl._is_libiio_v1() and getattr(ctx, "name", None) in ("network", "usb")
+
+
+def _data_format_dtype(df) -> np.dtype:
+    """Storage type of a single sample described by an iio data format"""
+    fmt = ("i" if df.is_signed is True else "u") + str(df.length // 8)
+    return np.dtype((">" if df.is_be else "<") + fmt)
+
+
+def _buffer_sample_dtype(channels: List[iio.Channel]) -> np.dtype:
+    """Structured type of one sample of a buffer with the given channels enabled.
+
+    Fields are named by channel id and placed at the offsets libiio uses
+    for sample interleaved buffers, so raw buffer memory can be viewed per
+    channel without demuxing it.
+
+    Args:
+        channels: List of enabled iio.Channel objects
+    """
+    names, formats, offsets = [], [], []
+    offset = 0
+    for chan in sorted(channels, key=lambda c: c.index):
+        df = chan.data_format
+        if df.repeat > 1:
+            raise Exception(
+                f"Channel {chan.id} has repeated samples which cannot be viewed "
+                + "without demuxing"
+            )
+        length = df.length // 8
+        if offset % length:
+            offset += length - offset % length
+        names.append(chan.id)
+        formats.append(_data_format_dtype(df))
+        offsets.append(offset)
+        offset += length
+    return np.dtype(
+        {"names": names, "formats": formats, "offsets": offsets, "itemsize": offset}
+    )
+
+
+def _buffer_sample_convert(samples: np.ndarray, channels: List[iio.Channel]):
+    """Shift and sign extend raw buffer samples in place.
+
+    This matches the conversion libiio applies when reading a single channel.
+
+    Args:
+        samples: Structured array of samples typed by _buffer_sample_dtype
+        channels: List of enabled iio.Channel objects
+    """
+    for chan in channels:
+        df = chan.data_format
+        unused = df.length - df.bits
+        if not df.shift and not unused:
+            continue
+        field = samples[chan.id]
+        if df.shift:
+            field >>= df.shift
+        if unused and df.is_signed:
+            field <<= unused
+            field >>= unused
+        elif unused:
+            field &= (1 << df.bits) - 1
+
+
+def _si_convert(raw, scale, offset, out):
+    """Convert raw samples of all channels to SI units.
+
+    Computes scale * (raw + offset) for every channel. Raw samples must
+    already be shifted and sign extended as described by the channel data
+    format, as done by libiio reads and _buffer_sample_convert. When out is
+    a 2-D array the arithmetic is applied to all channels at once.
+
+    Args:
+        raw: Raw samples shaped like out, or a list with one array per channel
+        scale: List of scales, one per channel
+        offset: List of offsets, one per channel
+        out: Floating point 2-D array with one row per channel, or a list of
+            1-D arrays, that results are written to
+    """
+    if isinstance(out, np.ndarray):
+        if isinstance(raw, np.ndarray):
+            np.copyto(out, raw)
+        else:
+            for o, r in zip(out, raw):
+                np.copyto(o, r)
+        np.add(out, np.asarray(offset, dtype=out.dtype)[:, None], out=out)
+        np.multiply(out, np.asarray(scale, dtype=out.dtype)[:, None], out=out)
+        return out
+
+    for o, r, chan_scale, chan_offset in zip(out, raw, scale, offset):
+        np.copyto(o, r)
+        np.add(o, chan_offset, out=o)
+        np.multiply(o, chan_scale, out=o)
+    return out
+
+
+class _waveform_cache:
+    """Least recently used cache of interleaved TX waveforms.
+
+    Entries are evicted once the total size of cached waveforms exceeds
+    max_bytes.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        data = self._entries.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.bytes_saved += data.nbytes
+        return data
+
+    def put(self, key, data: np.ndarray):
+        if data.nbytes > self.max_bytes:
+            return
+        self._entries[key] = data
+        self.nbytes += data.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "entries": len(self._entries),
+            "nbytes": self.nbytes,
+        }
+
+
 class phy(attribute):
     _ctrl: iio.Device = []
 
@@ -68,6 +223,21 @@ class rx_core(rx_tx_common, metaclass=ABCMeta):
     _rx_unbuffered_data = False
     _rx_annotated = False
     _rx_stack_interleaved = True  # Convert from channel to sample interleaved
+    _rx_zero_copy = False
+    _rx_output_ring_size = 0
+    _rx_si_dtype = np.float64
+    _rx_unbuffered_timestamps = None
+    __rx_sample_layout = None
+    __rx_sample_layout_buf = None
+    __rx_channel_meta = None
+    __rx_channel_meta_key = None
+    __rx_output_ring = []
+    __rx_output_ring_index = 0
+    __rx_streaming_queue = None
+    __rx_streaming_threads = []
+    __rx_streaming_stop_event = None
+    __rx_streaming_error = None
+    __rx_streaming_stats = {"blocks": 0, "dropped": 0, "overflows": 0}
 
     def __init__(self, rx_buffer_size=1024):
         N = 2 if self._complex_data else 1
@@ -113,6 +283,80 @@ class rx_core(rx_tx_common, metaclass=ABCMeta):
             raise ValueError(f"Invalid rx_output_type: {value}. Must be raw or SI")
         self._rx_output_type = value
 
+    @property
+    def rx_si_dtype(self):
+        """rx_si_dtype: Floating point type of rx() data in SI units
+
+        Either numpy.float64 (default) or numpy.float32, which halves the
+        memory used. Complex devices produce the matching complex type.
+        """
+        return self._rx_si_dtype
+
+    @rx_si_dtype.setter
+    def rx_si_dtype(self, value):
+        """rx_si_dtype: Floating point type of rx() data in SI units"""
+        if np.dtype(value) not in [np.float32, np.float64]:
+            raise ValueError(
+                f"Invalid rx_si_dtype: {value}. Must be numpy.float32 or numpy.float64"
+            )
+        self._rx_si_dtype = np.dtype(value).type
+
+    @property
+    def rx_zero_copy(self) -> bool:
+        """rx_zero_copy: Return channel data from rx() as views of the buffer
+
+        When True each capture is read out of the hardware buffer in a single
+        transfer and channels are returned as strided views of it instead of
+        being demuxed into separate arrays. Complex channels are produced by
+        converting the buffer once and viewing I/Q pairs as complex samples,
+        giving complex64 data for 16-bit converters.
+        """
+        return self._rx_zero_copy
+
+    @rx_zero_copy.setter
+    def rx_zero_copy(self, value: bool):
+        """rx_zero_copy: Return channel data from rx() as views of the buffer"""
+        self._rx_zero_copy = bool(value)
+
+    @property
+    def rx_output_ring_size(self) -> int:
+        """rx_output_ring_size: Number of reusable output buffers owned by rx()
+
+        When non-zero, rx() fills the next set of arrays from a ring of
+        preallocated buffers instead of allocating new arrays on each call.
+        Data returned by rx() is overwritten after this many further calls,
+        so it must be consumed or copied before then. Set to 0 to disable.
+        """
+        return self._rx_output_ring_size
+
+    @rx_output_ring_size.setter
+    def rx_output_ring_size(self, value: int):
+        """rx_output_ring_size: Number of reusable output buffers owned by rx()"""
+        if not isinstance(value, int) or value < 0:
+            raise ValueError("rx_output_ring_size must be a non-negative integer")
+        self._rx_output_ring_size = value
+        self.__rx_output_ring = []
+        self.__rx_output_ring_index = 0
+
+    @property
+    def rx_unbuffered_timestamps(self):
+        """rx_unbuffered_timestamps: Sample times of the last unbuffered capture
+
+        Array of monotonic times in seconds at which each sample period of
+        the last rx() call was read, for devices without buffer support.
+        """
+        return self._rx_unbuffered_timestamps
+
+    @property
+    def rx_unbuffered_sample_rate(self) -> float:
+        """rx_unbuffered_sample_rate: Effective sample rate of the last
+        unbuffered capture in samples per second
+        """
+        t = self._rx_unbuffered_timestamps
+        if t is None or len(t) < 2 or t[-1] == t[0]:
+            return None
+        return (len(t) - 1) / (t[-1] - t[0])
+
     @property
     def rx_buffer_size(self):
         """rx_buffer_size: Size of receive buffer in samples"""
@@ -122,6 +366,28 @@ class rx_core(rx_tx_common, metaclass=ABCMeta):
     def rx_buffer_size(self, value):
         self._rx_buffer_size = value
 
+    @property
+    def rx_buffer_num_blocks(self) -> int:
+        """rx_buffer_num_blocks: Number of hardware blocks queued for DMA
+
+        Deeper queues give more headroom before samples are lost when the
+        host is slow to read buffers. Must be set before the RX buffer is
+        created. Defaults to 4 with libiio v1 and to the driver default
+        with libiio v0.
+        """
+        return self._rx_buffer_num_blocks
+
+    @rx_buffer_num_blocks.setter
+    def rx_buffer_num_blocks(self, value: int):
+        if self._rxbuf:
+            raise Exception(
+                "RX buffer already created, buffer must be "
+                "destroyed then recreated to modify rx_buffer_num_blocks"
+            )
+        if not isinstance(value, int) or value < 1:
+            raise ValueError("rx_buffer_num_blocks must be a positive integer")
+        self._rx_buffer_num_blocks = value
+
     @property
     def rx_enabled_channels(self) -> Union[List[int], List[str]]:
         """rx_enabled_channels: List of enabled channels (channel 1 is 0)
@@ -177,7 +443,11 @@ class rx_core(rx_tx_common, metaclass=ABCMeta):
 
     def rx_destroy_buffer(self):
         """rx_destroy_buffer: Clears RX buffer"""
+        if self.__rx_streaming_threads:
+            self.rx_streaming_stop()
         self._rxbuf = None
+        self.__rx_sample_layout_buf = None
+        self.__rx_channel_meta_key = None
 
     def __del__(self):
         self._rxbuf = []
@@ -187,100 +457,499 @@ class rx_core(rx_tx_common, metaclass=ABCMeta):
                 v.enabled = False
         self._rxadc = []
 
+    def __get_rx_channel_meta(self):
+        """Cached format, scale, and offset of each enabled RX channel.
+
+        For complex devices there is an entry for each I and Q channel.
+
+        The cache is rebuilt when the enabled channels or buffer change, or
+        after any attribute has been written through pyadi-iio.
+        """
+        key = (
+            tuple(self.rx_enabled_channels),
+            id(self._rxbuf),
+            attribute._write_generation,
+        )
+        if self.__rx_channel_meta_key == key:
+            return self.__rx_channel_meta
+
+        if self._complex_data:
+            names = []
+            for m in self.rx_enabled_channels:
+                names.extend(
+                    (self._rx_channel_names[m * 2], self._rx_channel_names[m * 2 + 1])
+                )
+        else:
+            names = [self._rx_channel_names[m] for m in self.rx_enabled_channels]
+
+        meta = []
+        for name in names:
+            v = self._rxadc.find_channel(name)
+            meta.append(
+                {
+                    "dtype": cl._channel_dtype(v),
+                    "scale": self._get_iio_attr(name, "scale", False)
+                    if "scale" in v.attrs
+                    else 1.0,
+                    "offset": self._get_iio_attr(name, "offset", False)
+                    if "offset" in v.attrs
+                    else 0.0,
+                }
+            )
+        self.__rx_channel_meta = meta
+        self.__rx_channel_meta_key = key
+        return meta
+
+    def rx_invalidate_channel_meta(self):
+        """rx_invalidate_channel_meta: Reread channel scales and offsets
+
+        Channel formats, scales, and offsets are cached and refreshed
+        automatically when attributes are written through pyadi-iio. This
+        must be called when they are changed by other means, such as
+        another process.
+        """
+        self.__rx_channel_meta_key = None
+
     def __get_rx_channel_scales(self):
-        rx_scale = []
-        for i in self.rx_enabled_channels:
-            v = self._rxadc.find_channel(self._rx_channel_names[i])
-            if "scale" in v.attrs:
-                scale = self._get_iio_attr(self._rx_channel_names[i], "scale", False)
-            else:
-                scale = 1.0
-            rx_scale.append(scale)
-        return rx_scale
+        return [m["scale"] for m in self.__get_rx_channel_meta()]
 
     def __get_rx_channel_offsets(self):
-        rx_offset = []
-        for i in self.rx_enabled_channels:
-            v = self._rxadc.find_channel(self._rx_channel_names[i])
-            if "offset" in v.attrs:
-                offset = self._get_iio_attr(self._rx_channel_names[i], "offset", False)
-            else:
-                offset = 0.0
-            rx_offset.append(offset)
-        return rx_offset
+        return [m["offset"] for m in self.__get_rx_channel_meta()]
+
+    @staticmethod
+    def __rx_unbuffered_read(attrs, raw, timestamps, executor=None):
+        """Read the raw attribute of each channel once per sample period.
 
-    def __rx_unbuffered_data(self):
-        x = []
+        With an executor, the workers read the other channels of a period
+        while the caller reads the first one, so the reads of a period take a
+        single round trip.
+        """
+        for samp in range(len(timestamps)):
+            timestamps[samp] = time.monotonic()
+            if executor is None:
+                for index, attr in enumerate(attrs):
+                    raw[index, samp] = get_numbers(attr.value)
+                continue
+            futures = [executor.submit(getattr, attr, "value") for attr in attrs[1:]]
+            try:
+                raw[0, samp] = get_numbers(attrs[0].value)
+            finally:
+                wait(futures)
+            for index, future in enumerate(futures, 1):
+                raw[index, samp] = get_numbers(future.result())
+
+    def __rx_unbuffered_data(self, out=None):
         t = (
             self._rx_data_si_type
             if self._rx_output_type == "SI"
             else self._rx_data_type
         )
-        for _ in range(len(self.rx_enabled_channels)):
-            x.append(np.zeros(self.rx_buffer_size, dtype=t))
 
         # Get scalers first
         if self._rx_output_type == "SI":
             rx_scale = self.__get_rx_channel_scales()
             rx_offset = self.__get_rx_channel_offsets()
 
-        for samp in range(self.rx_buffer_size):
-            for i, m in enumerate(self.rx_enabled_channels):
-                raw = self._get_iio_attr(
-                    self._rx_channel_names[m], "raw", False, self._rxadc
-                )
-                if self._rx_output_type == "SI":
-                    x[i][samp] = (raw + rx_offset[i]) * rx_scale[i]
-                else:
-                    x[i][samp] = raw
+        raw = np.zeros(
+            (len(self.rx_enabled_channels), self.rx_buffer_size),
+            dtype=np.float64 if self._rx_output_type == "SI" else t,
+        )
+        # Resolve attributes once, then read all channels each sample period
+        attrs = [
+            self._rxadc.find_channel(self._rx_channel_names[m], False).attrs["raw"]
+            for m in self.rx_enabled_channels
+        ]
+        timestamps = np.empty(self.rx_buffer_size)
+        executor = None
+        ctx = _device_context(self._rxadc)
+        if len(attrs) > 1 and _serves_concurrently(ctx):
+            executor = _context_readers(ctx, len(attrs) - 1)
+        self.__rx_unbuffered_read(attrs, raw, timestamps, executor)
+        self._rx_unbuffered_timestamps = timestamps
+        if self._rx_output_type == "SI":
+            _si_convert(raw, rx_scale, rx_offset, raw)
+
+        if out is not None:
+            x = self.__rx_check_output(out, self.rx_buffer_size)
+            for o, r in zip(x, raw):
+                np.copyto(o, r, casting="unsafe")
+            return x
+        return list(raw.astype(t, copy=False))
 
-        return x
+    def __rx_buffered_samples(self):
+        """Read one buffer as a structured array with a field per channel.
 
-    def __rx_complex(self):
+        Returns:
+            Tuple of the samples and the field names in rx_enabled_channels order
+        """
+        data = self._rx_buffered_block()
+        channels = self._rx_buffer_channels
+        if self.__rx_sample_layout_buf != id(self._rxbuf):
+            dtype = _buffer_sample_dtype(channels)
+            self.__rx_sample_layout = (dtype, [chan.id for chan in channels])
+            self.__rx_sample_layout_buf = id(self._rxbuf)
+        dtype, fields = self.__rx_sample_layout
+        samples = np.frombuffer(data, dtype=dtype)
+        _buffer_sample_convert(samples, channels)
+        return samples, fields
+
+    def __rx_complex_views(self):
+        """Complex channel data viewed from a single buffer read"""
+        samples, fields = self.__rx_buffered_samples()
+        dtype = samples.dtype
+        base = dtype.fields[fields[0]][0]
+        if base.itemsize <= 2:
+            ftype, ctype = np.float32, np.complex64
+        else:
+            ftype, ctype = np.float64, np.complex128
+
+        # Use a single dtype view when I/Q pairs are adjacent in each sample
+        columns = []
+        packed = dtype.itemsize == base.itemsize * len(fields) and all(
+            dtype.fields[f][0] == base for f in fields
+        )
+        for i, q in zip(fields[::2], fields[1::2]):
+            i_offset, q_offset = dtype.fields[i][1], dtype.fields[q][1]
+            if (
+                not packed
+                or q_offset != i_offset + base.itemsize
+                or i_offset % (2 * base.itemsize)
+            ):
+                columns = None
+                break
+            columns.append(i_offset // (2 * base.itemsize))
+
+        if columns is not None:
+            iq = samples.view(base).reshape(len(samples), -1)
+            iq = iq.astype(ftype).view(ctype)
+            return [iq[:, c] for c in columns]
+
+        out = np.empty((len(fields) // 2, len(samples)), dtype=ctype)
+        for k, (i, q) in enumerate(zip(fields[::2], fields[1::2])):
+            out[k].real = samples[i]
+            out[k].imag = samples[q]
+        return list(out)
+
+    def __rx_channel_data(self):
+        """Per channel (or I/Q component) data from a single buffer read"""
+        if self._rx_zero_copy:
+            samples, fields = self.__rx_buffered_samples()
+            return [samples[f] for f in fields]
         x = self._rx_buffered_data()
-        if len(x) % 2 != 0:
+        return x if isinstance(x, list) else [x]
+
+    def __rx_check_output(self, out, length):
+        """Validate caller supplied output arrays for rx()"""
+        outs = out if isinstance(out, list) else [out]
+        if len(outs) != len(self.rx_enabled_channels):
             raise Exception(
-                "Complex data must have an even number of component channels"
+                "out must provide one array for each channel in rx_enabled_channels"
             )
-        out = [x[i] + 1j * x[i + 1] for i in range(0, len(x), 2)]
+        for o in outs:
+            if not isinstance(o, np.ndarray) or o.shape != (length,):
+                raise Exception(f"out arrays must be numpy arrays of shape ({length},)")
+        return outs
+
+    def __rx_output_buffers(self, out, length, dtype):
+        """Output arrays supplied by the caller or taken from the ring"""
+        if out is not None:
+            return self.__rx_check_output(out, length)
+
+        channels = len(self.rx_enabled_channels)
+        ring = self.__rx_output_ring
+        if not ring or ring[0].shape != (channels, length) or ring[0].dtype != dtype:
+            ring = [
+                np.empty((channels, length), dtype=dtype)
+                for _ in range(self._rx_output_ring_size)
+            ]
+            self.__rx_output_ring = ring
+            self.__rx_output_ring_index = 0
+        outs = ring[self.__rx_output_ring_index]
+        self.__rx_output_ring_index = (self.__rx_output_ring_index + 1) % len(ring)
+        return list(outs)
+
+    def __rx_complex(self, out=None, rx_scale=None, rx_offset=None):
+        if self._rx_output_type == "SI":
+            if rx_scale is None:
+                rx_scale = self.__get_rx_channel_scales()
+                rx_offset = self.__get_rx_channel_offsets()
+            x = self.__rx_channel_data()
+            if out is not None or self._rx_output_ring_size:
+                ctype = np.result_type(self._rx_si_dtype, np.complex64)
+                out = self.__rx_output_buffers(out, len(x[0]), ctype)
+                components = [p for o in out for p in (o.real, o.imag)]
+                _si_convert(x, rx_scale, rx_offset, components)
+            else:
+                # Convert I/Q rows of a sample interleaved array then view as complex
+                iq = np.empty((len(x[0]), len(x)), dtype=self._rx_si_dtype)
+                _si_convert(x, rx_scale, rx_offset, iq.T)
+                iq = iq.view(np.result_type(self._rx_si_dtype, np.complex64))
+                out = [iq[:, k] for k in range(iq.shape[1])]
+        elif self._rx_output_type != "raw":
+            raise Exception("_rx_output_type undefined")
+        elif out is not None or self._rx_output_ring_size:
+            x = self.__rx_channel_data()
+            if self._rx_zero_copy and x[0].dtype.itemsize <= 2:
+                dtype = np.complex64
+            else:
+                dtype = np.complex128
+            out = self.__rx_output_buffers(out, len(x[0]), dtype)
+            for k, o in enumerate(out):
+                np.copyto(o.real, x[2 * k])
+                np.copyto(o.imag, x[2 * k + 1])
+        elif self._rx_zero_copy:
+            out = self.__rx_complex_views()
+        else:
+            x = self._rx_buffered_data()
+            if len(x) % 2 != 0:
+                raise Exception(
+                    "Complex data must have an even number of component channels"
+                )
+            out = [x[i] + 1j * x[i + 1] for i in range(0, len(x), 2)]
         # Don't return list if a single channel
-        return out[0] if len(x) == 2 else out
+        return out[0] if len(out) == 1 else out
 
-    def __rx_non_complex(self):
-        x = self._rx_buffered_data()
+    def __rx_non_complex(self, out=None, rx_scale=None, rx_offset=None):
+        x = self.__rx_channel_data()
         if self._rx_output_type == "SI":
-            rx_scale = self.__get_rx_channel_scales()
-            rx_offset = self.__get_rx_channel_offsets()
-            x = x if isinstance(x, list) else [x]
-            x = [rx_scale[i] * (x[i] + rx_offset[i]) for i in range(len(x))]
+            if rx_scale is None:
+                rx_scale = self.__get_rx_channel_scales()
+                rx_offset = self.__get_rx_channel_offsets()
+            if out is not None or self._rx_output_ring_size:
+                out = self.__rx_output_buffers(out, len(x[0]), self._rx_si_dtype)
+            else:
+                out = np.empty((len(x), len(x[0])), dtype=self._rx_si_dtype)
+            x = list(_si_convert(x, rx_scale, rx_offset, out))
         elif self._rx_output_type != "raw":
             raise Exception("_rx_output_type undefined")
+        elif out is not None or self._rx_output_ring_size:
+            out = self.__rx_output_buffers(out, len(x[0]), x[0].dtype)
+            for i, o in enumerate(out):
+                np.copyto(o, x[i])
+            x = out
 
         # Don't return list if a single channel
         return x[0] if len(self.rx_enabled_channels) == 1 else x
 
-    def rx(self):
+    def rx(self, out=None):
         """Receive data from hardware buffers for each channel index in
         rx_enabled_channels.
 
+        args: type=numpy.array or list of numpy.array
+            Optional arrays to fill in place instead of allocating new ones.
+            One array of rx_buffer_size samples is required for each
+            enabled channel, with a dtype the output can be cast to.
+
         returns: type=numpy.array or list of numpy.array
             An array or list of arrays when more than one receive channel
             is enabled containing samples from a channel or set of channels.
             Data will be complex when using a complex data device.
         """
         if self._rx_unbuffered_data:
-            data = self.__rx_unbuffered_data()
+            data = self.__rx_unbuffered_data(out)
         else:
             if self._complex_data:
-                data = self.__rx_complex()
+                data = self.__rx_complex(out)
             else:
-                data = self.__rx_non_complex()
+                data = self.__rx_non_complex(out)
         if self._rx_annotated:
             return self._annotate(
                 data, self._rx_channel_names, self.rx_enabled_channels
             )
         return data
 
+    def rx_iter(self, n_blocks: int = None):
+        """Generator receiving buffers continuously from hardware.
+
+        Channel scales and offsets are read once before the first buffer and
+        the same hardware buffer is reused for every block, so iterating is
+        cheaper than calling rx() in a loop. Changes to properties that
+        affect the data format made while iterating are not applied until a
+        new iterator is created.
+
+        Args:
+            n_blocks: Number of buffers to receive. When None, buffers are
+                received until the generator is closed.
+
+        yields: type=numpy.array or list of numpy.array
+            Data in the same format as rx()
+        """
+        if self._rx_unbuffered_data:
+            raise Exception("rx_iter is only supported for buffered devices")
+        rx_scale = rx_offset = None
+        if self._rx_output_type == "SI":
+            rx_scale = self.__get_rx_channel_scales()
+            rx_offset = self.__get_rx_channel_offsets()
+        block = 0
+        while n_blocks is None or block < n_blocks:
+            if self._complex_data:
+                data = self.__rx_complex(None, rx_scale, rx_offset)
+            else:
+                data = self.__rx_non_complex(None, rx_scale, rx_offset)
+            if self._rx_annotated:
+                data = self._annotate(
+                    data, self._rx_channel_names, self.rx_enabled_channels
+                )
+            yield data
+            block += 1
+
+    async def rx_async(self, out=None):
+        """Receive data like rx() without blocking the event loop.
+
+        Captures run on an executor dedicated to the device's context, so
+        captures from devices on different contexts can be awaited together
+        with asyncio.gather.
+        """
+        return await self._run_async(self.rx, out)
+
+    @property
+    def rx_streaming(self) -> bool:
+        """rx_streaming: True while background RX streaming is running"""
+        return any(t.is_alive() for t in self.__rx_streaming_threads)
+
+    @property
+    def rx_streaming_stats(self) -> dict:
+        """rx_streaming_stats: Counters of the current or last RX stream
+
+        Contains the number of buffers captured (blocks), buffers dropped
+        because the queue was full (dropped), and hardware overflows
+        detected (overflows).
+        """
+        return dict(self.__rx_streaming_stats)
+
+    def rx_streaming_start(
+        self,
+        callback: Callable = None,
+        queue_depth: int = 4,
+        check_overflow: bool = False,
+    ):
+        """Start capturing buffers continuously from a background thread.
+
+        Buffers are captured with rx() and handed off through a queue holding
+        at most queue_depth buffers. When the queue is full, newly captured
+        buffers are dropped and counted in rx_streaming_stats. rx() must not
+        be called directly while streaming.
+
+        Args:
+            callback: Function called with each buffer from a separate
+                thread. When None, buffers are read with rx_streaming_get.
+            queue_depth: Maximum number of buffers waiting to be consumed
+            check_overflow: Check the AXI ADC status register for overflows
+                after each buffer. Only applies to FPGA based devices.
+        """
+        if self.rx_streaming:
+            raise Exception("RX streaming already started")
+        if not isinstance(queue_depth, int) or queue_depth < 1:
+            raise ValueError("queue_depth must be a positive integer")
+        ring_size = self._rx_output_ring_size
+        if ring_size and ring_size < queue_depth + 2:
+            raise Exception(
+                "rx_output_ring_size must be at least queue_depth + 2 "
+                + "to hold buffers in flight while streaming"
+            )
+
+        self.__rx_streaming_queue = queue.Queue()
+        self.__rx_streaming_stop_event = threading.Event()
+        self.__rx_streaming_error = None
+        self.__rx_streaming_stats = {"blocks": 0, "dropped": 0, "overflows": 0}
+        threads = [
+            threading.Thread(
+                target=self.__rx_streaming_producer,
+                args=(queue_depth, check_overflow),
+                daemon=True,
+            )
+        ]
+        if callback:
+            threads.append(
+                threading.Thread(
+                    target=self.__rx_streaming_consumer, args=(callback,), daemon=True
+                )
+            )
+        self.__rx_streaming_threads = threads
+        for thread in threads:
+            thread.start()
+
+    def rx_streaming_get(self, timeout: float = None):
+        """Get the next buffer captured by background RX streaming.
+
+        Args:
+            timeout: Seconds to wait for a buffer. Waits forever when None.
+
+        returns: type=numpy.array or list of numpy.array
+            Data in the same format as rx(), or None once streaming has
+            stopped and all captured buffers have been read
+        """
+        if not self.__rx_streaming_queue:
+            raise Exception("RX streaming has not been started")
+        if len(self.__rx_streaming_threads) > 1:
+            raise Exception("RX streaming buffers are being passed to a callback")
+        try:
+            data = self.__rx_streaming_queue.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("No RX data received before timeout")
+        if data is None:
+            # Leave end of stream marker for later calls
+            self.__rx_streaming_queue.put(None)
+        return data
+
+    def rx_streaming_stop(self):
+        """Stop background RX streaming and wait for its threads to exit.
+
+        Buffers already queued can still be read with rx_streaming_get.
+        Errors raised by rx() or the callback while streaming are raised
+        here.
+        """
+        if not self.__rx_streaming_threads:
+            return
+        self.__rx_streaming_stop_event.set()
+        for thread in self.__rx_streaming_threads:
+            thread.join()
+        self.__rx_streaming_threads = []
+
+        error = self.__rx_streaming_error
+        self.__rx_streaming_error = None
+        if error:
+            raise Exception(f"RX streaming failed: {error}") from error
+
+    def __rx_streaming_producer(self, queue_depth, check_overflow):
+        buffers = self.__rx_streaming_queue
+        stats = self.__rx_streaming_stats
+        try:
+            if check_overflow:
+                # Clear status register
+                self._rxadc.reg_write(0x80000088, 0x6)
+            while not self.__rx_streaming_stop_event.is_set():
+                data = self.rx()
+                stats["blocks"] += 1
+                if check_overflow:
+                    status = self._rxadc.reg_read(0x80000088)
+                    if status & 4:
+                        stats["overflows"] += 1
+                        self._rxadc.reg_write(0x80000088, status)  # Clear
+                if buffers.qsize() >= queue_depth:
+                    stats["dropped"] += 1
+                else:
+                    buffers.put(data)
+        except Exception as ex:
+            self.__rx_streaming_error = ex
+        finally:
+            # End of stream marker
+            buffers.put(None)
+
+    def __rx_streaming_consumer(self, callback):
+        buffers = self.__rx_streaming_queue
+        while True:
+            data = buffers.get()
+            if data is None:
+                return
+            if self.__rx_streaming_error:
+                continue
+            try:
+                callback(data)
+            except Exception as ex:
+                self.__rx_streaming_error = ex
+                self.__rx_streaming_stop_event.set()
+
     @abstractmethod
     def _rx_init_channels(self):
         """Initialize RX channels"""
@@ -305,6 +974,7 @@ class tx_core(dds, rx_tx_common, metaclass=ABCMeta):
     _output_byte_filename = "out.bin"
     _push_to_file = False
     _tx_cyclic_buffer = False
+    __tx_waveform_cache = None
 
     def __init__(self, tx_cyclic_buffer=False):
         N = 2 if self._complex_data else 1
@@ -346,6 +1016,37 @@ class tx_core(dds, rx_tx_common, metaclass=ABCMeta):
             )
         self._tx_cyclic_buffer = value
 
+    @property
+    def tx_waveform_cache_size(self) -> int:
+        """tx_waveform_cache_size: Memory budget in bytes for cached TX waveforms
+
+        When non-zero, tx() keeps the interleaved device format of recently
+        transmitted waveforms, keyed by a hash of their content. Submitting
+        an identical waveform again, for example after tx_destroy_buffer(),
+        then skips conversion and interleaving. Least recently used
+        waveforms are evicted once the budget is exceeded. Set to 0 to
+        disable and clear the cache.
+        """
+        if not self.__tx_waveform_cache:
+            return 0
+        return self.__tx_waveform_cache.max_bytes
+
+    @tx_waveform_cache_size.setter
+    def tx_waveform_cache_size(self, value: int):
+        """tx_waveform_cache_size: Memory budget in bytes for cached TX waveforms"""
+        if not isinstance(value, int) or value < 0:
+            raise ValueError("tx_waveform_cache_size must be a non-negative integer")
+        self.__tx_waveform_cache = _waveform_cache(value) if value else None
+
+    @property
+    def tx_waveform_cache_stats(self) -> dict:
+        """tx_waveform_cache_stats: Hit rate and bytes saved by the TX waveform
+        cache
+        """
+        if not self.__tx_waveform_cache:
+            return _waveform_cache(0).stats()
+        return self.__tx_waveform_cache.stats()
+
     @property
     def _num_tx_channels_enabled(self):
         return len(self.tx_enabled_channels)
@@ -409,6 +1110,47 @@ class tx_core(dds, rx_tx_common, metaclass=ABCMeta):
         """tx_destroy_buffer: Clears TX buffer"""
         self._txbuf = None
 
+    def __tx_waveform_key(self, data_np):
+        """Hash of waveform content and the settings used to interleave it"""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(
+            repr(
+                (
+                    self._tx_data_type.str,
+                    self._complex_data,
+                    tuple(self.tx_enabled_channels),
+                )
+            ).encode()
+        )
+        for chan in data_np:
+            chan = np.ascontiguousarray(chan)
+            h.update(repr((chan.dtype.str, chan.shape)).encode())
+            h.update(memoryview(chan.reshape(-1).view(np.uint8)))
+        return h.digest()
+
+    def __tx_interleave(self, data_np):
+        """Interleave all channels into a single preallocated sample array"""
+        length = len(data_np[0])
+        if self._complex_data:
+            stride = self._num_tx_channels_enabled * 2
+            data = np.empty((length, stride // 2, 2), dtype=self._tx_data_type)
+            for indx, chan in enumerate(data_np):
+                chan = np.asarray(chan)
+                if np.iscomplexobj(chan) and chan.flags.c_contiguous:
+                    # View complex samples as I/Q pairs without temporaries
+                    iq = chan.view(chan.real.dtype).reshape(length, 2)
+                    np.copyto(data[:, indx, :], iq, casting="unsafe")
+                else:
+                    np.copyto(data[:, indx, 0], np.real(chan), casting="unsafe")
+                    np.copyto(data[:, indx, 1], np.imag(chan), casting="unsafe")
+            data = data.reshape(length, stride)
+        else:
+            stride = self._num_tx_channels_enabled
+            data = np.empty((length, stride), dtype=self._tx_data_type)
+            for indx, chan in enumerate(data_np):
+                np.copyto(data[:, indx], chan, casting="unsafe")
+        return data
+
     def tx(self, data_np=None):
         """Transmit data to hardware buffers for each channel index in
         tx_enabled_channels.
@@ -447,60 +1189,56 @@ class tx_core(dds, rx_tx_common, metaclass=ABCMeta):
                 "To push more data the tx buffer must be destroyed first."
             )
 
-        if self._complex_data:
-            if self._num_tx_channels_enabled == 1:
-                data_np = [data_np]
+        if self._num_tx_channels_enabled == 1:
+            data_np = [data_np]
 
-            if len(data_np) != self._num_tx_channels_enabled:
-                raise Exception("Not enough data provided for channel mapping")
+        if len(data_np) != self._num_tx_channels_enabled:
+            raise Exception("Not enough data provided for channel mapping")
 
-            indx = 0
-            stride = self._num_tx_channels_enabled * 2
-            data = np.empty(stride * len(data_np[0]), dtype=self._tx_data_type)
-            for chan in data_np:
-                i = np.real(chan)
-                q = np.imag(chan)
-                data[indx::stride] = i.astype(self._tx_data_type)
-                data[indx + 1 :: stride] = q.astype(self._tx_data_type)
-                indx = indx + 2
+        if self.__tx_waveform_cache:
+            key = self.__tx_waveform_key(data_np)
+            data = self.__tx_waveform_cache.get(key)
+            if data is None:
+                data = self.__tx_interleave(data_np)
+                self.__tx_waveform_cache.put(key, data)
         else:
-            if self._num_tx_channels_enabled == 1:
-                data_np = [data_np]
-
-            if len(data_np) != self._num_tx_channels_enabled:
-                raise Exception("Not enough data provided for channel mapping")
-
-            indx = 0
-            stride = self._num_tx_channels_enabled
-            data = np.empty(stride * len(data_np[0]), dtype=self._tx_data_type)
-            for chan in data_np:
-                data[indx::stride] = chan.astype(self._tx_data_type)
-                indx = indx + 1
+            data = self.__tx_interleave(data_np)
+        length = len(data)
 
         if not self._txbuf:
             self.disable_dds()
-            self._tx_buffer_size = len(data) // stride
+            self._tx_buffer_size = length
             self._tx_init_channels()
 
-        if len(data) // stride != self._tx_buffer_size:
+        if length != self._tx_buffer_size:
             raise Exception(
                 "Buffer length different than data length. "
                 "Cannot change buffer length on the fly"
             )
 
-        # Send data to buffer
+        # Send data to buffer as bytes without copying
+        payload = memoryview(data.reshape(-1).view(np.uint8))
         if self._push_to_file:
             f = open(self._output_byte_filename, "ab")
-            f.write(bytearray(data))
+            f.write(payload)
             f.close()
         else:
-            self._tx_buffer_push(data)
+            self._tx_buffer_push(payload)
+
+    async def tx_async(self, data_np=None):
+        """Transmit data like tx() without blocking the event loop.
+
+        Transfers run on an executor dedicated to the device's context, so
+        transfers to devices on different contexts can be awaited together
+        with asyncio.gather.
+        """
+        await self._run_async(self.tx, data_np)
 
     @abstractmethod
     def _tx_buffer_push(self, data):
         """Push data to TX buffer.
 
-        data: bytearray
+        data: memoryview of sample interleaved bytes
         """
         raise NotImplementedError
 
@@ -603,16 +1341,18 @@ class shared_def(context_manager, metaclass=ABCMeta):
             context_manager.__init__(self, uri_ctx, self._device_name)
         else:
             required_devices = [self._rx_data_device_name, self._control_device_name]
-            contexts = iio.scan_contexts()
-            self._ctx = None
-            for c in contexts:
-                ctx = iio.Context(c)
-                devs = [dev.name for dev in ctx.devices]
-                if all(dev in devs for dev in required_devices):
-                    self._ctx = iio.Context(c)
-                    break
-            if not self._ctx:
+
+            def match(_, devs):
+                # Device names are not part of scan descriptions
+                if devs is None:
+                    return None
+                return all(dev in devs for dev in required_devices)
+
+            uri, ctx = _discover_context(match)
+            if not uri:
                 raise Exception("No context could be found for class")
+            self.uri = uri
+            self._ctx = self._open_context(uri, ctx)
 
         # Set up devices
         if self._control_device_name:
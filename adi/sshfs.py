@@ -2,6 +2,9 @@
 # SKIP LICENSE INSERTION
 # SPDX short identifier: ADIBSD
 
+import shlex
+import stat
+import uuid
 from contextlib import suppress
 
 import paramiko
@@ -32,6 +35,21 @@ class sshfs:
                 look_for_keys=False,
                 allow_agent=False,
             )
+        self._sftp = None
+
+    @property
+    def sftp(self):
+        """SFTP session kept open for all file operations"""
+        if self._sftp is None or self._sftp.get_channel().closed:
+            self._sftp = self.ssh.open_sftp()
+        return self._sftp
+
+    def close(self):
+        """Close the SFTP session and SSH connection"""
+        if self._sftp is not None:
+            self._sftp.close()
+            self._sftp = None
+        self.ssh.close()
 
     def _run(self, cmd):
         (_, out, err) = self.ssh.exec_command(cmd)  # pylint: ignore=B601
@@ -41,13 +59,49 @@ class sshfs:
         return stdout, stderr
 
     def isfile(self, path):
-        stdout, _ = self._run(f"test -f {path}; echo $?")
-        return stdout == "0"
+        try:
+            return stat.S_ISREG(self.sftp.stat(path).st_mode)
+        except IOError:
+            return False
 
     def listdir(self, path):
-        stdout, _ = self._run(f"ls -1 {path}")
-        return stdout.split()
+        try:
+            names = self.sftp.listdir(path)
+        except IOError:
+            return []
+        # Match the output of ls
+        return sorted(name for name in names if not name.startswith("."))
 
     def gettext(self, path, *kargs, **kwargs):
-        stdout, _ = self._run(f"cat {path}")
-        return stdout
+        try:
+            with self.sftp.open(path) as f:
+                return f.read().decode().strip()
+        except IOError:
+            return ""
+
+    def read_many(self, paths):
+        """Read multiple text files with a single remote command
+
+        parameters:
+            paths: type=list[string]
+                Paths of the files to read
+
+        returns: type=dict
+            Stripped contents of each path, or None for files that could
+            not be read
+        """
+        paths = list(paths)
+        if not paths:
+            return {}
+        # Each file is followed by a marker line with the exit status of cat
+        marker = uuid.uuid4().hex
+        cmd = "for f in {}; do cat \"$f\" 2>/dev/null; printf '\\n{} %d\\n' $?; done"
+        cmd = cmd.format(" ".join(shlex.quote(path) for path in paths), marker)
+        (_, out, _) = self.ssh.exec_command(cmd)  # pylint: ignore=B601
+        rest = out.read().decode()
+        contents = {}
+        for path in paths:
+            text, _, rest = rest.partition("\n{} ".format(marker))
+            status, _, rest = rest.partition("\n")
+            contents[path] = text.strip() if status == "0" else None
+        return contents
@@ -2,8 +2,10 @@
 #
 # SPDX short identifier: ADIBSD
 
+import time
+from concurrent.futures import FIRST_EXCEPTION, wait
 
-from adi.attribute import attribute
+from adi.attribute import _context_executor, attribute
 
 
 class sync_start(attribute):
@@ -99,3 +101,243 @@ class sync_start(attribute):
             )
         except:  # noqa: E722
             return "arm"
+
+
+class sync_start_multi(object):
+    """ Multi-SOM Synchronization: Shared handling of managers of multiple
+        SOMs whose captures are aligned by a common sysref. Devices are the
+        primary followed by the secondaries.
+    """
+
+    # Time in seconds the JESD204 FSM of all devices may take to finish
+    _jesd204_fsm_timeout = 30
+    # Bounds of the time in seconds between polls of the JESD204 FSM
+    _jesd204_fsm_poll_min = 0.01
+    _jesd204_fsm_poll_max = 0.5
+    # Time in seconds after which failed initializations are no longer retried
+    _pre_rx_setup_timeout = 60
+    _jesd_fsm_show_status = False
+    _dma_show_arming = False
+    _resync_tx = False
+    _rx_initialized = False
+
+    def jesd_monitor(self, interval=1.0, history=1024, callback=None):
+        """jesd_monitor: Create a monitor of the JESD204 links of all devices
+
+        parameters:
+            interval: type=float
+                Time in seconds between polls
+            history: type=int
+                Number of polls and events kept
+            callback: type=function
+                Called from the monitor thread with each event
+
+        returns: type=adi.jesd.jesd_link_monitor
+            Monitor of the devices with a JESD object, keyed by URI. Use
+            start and stop, or a with statement, to poll in the background
+        """
+        # Imported here since the JESD dependencies are optional
+        from adi.jesd import jesd_link_monitor
+
+        if not jesd_link_monitor:
+            raise Exception(
+                "JESD optional dependencies are required.\n"
+                + "Please install them using pip install pyadi-iio[jesd] "
+                + "or pip install paramiko"
+            )
+        jesds = {
+            dev.uri: dev._jesd
+            for dev in [self.primary] + self.secondaries
+            if getattr(dev, "_jesd", None)
+        }
+        return jesd_link_monitor(jesds, interval, history, callback)
+
+    def _map_devices(self, func, devs=None):
+        """Run func on all devices, or the given ones, concurrently, returning
+        the results in the order of [primary] + secondaries. Calls into the
+        same context are serialized while devices with their own context run
+        in parallel.
+        """
+        if devs is None:
+            devs = [self.primary] + self.secondaries
+        futures = [_context_executor(dev.ctx).submit(func, dev) for dev in devs]
+        # Raise the first error without waiting on devices that may never
+        # finish. Later calls into their contexts still run after them
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in done:
+            if future.exception() is not None:
+                raise future.exception()
+        return [future.result() for future in futures]
+
+    def _rx_dma_arm(self):
+        def arm(dev):
+            if self._dma_show_arming:
+                print("--DMA ARMING--", dev.uri)
+            dev.rx_sync_start = "arm"
+            if self._dma_show_arming:
+                print("\n--DMA ARMED--", dev.uri)
+
+        self._map_devices(arm)
+
+    def _dds_sync_enable(self, enable):
+        def arm(dev):
+            if self._dma_show_arming:
+                print("--DAC SYNC ARMING--", dev.uri)
+            dev.tx_sync_start = "arm"
+
+        self._map_devices(arm)
+
+    @staticmethod
+    def _recreate_rx_buffer(dev):
+        dev.rx_destroy_buffer()
+        dev._rx_init_channels()
+
+    def _device_is_running(self, dev, index, verbose):
+        """Get the JESD204 FSM status and state of a device"""
+        err = dev.jesd204_fsm_error
+        paused = dev.jesd204_fsm_paused
+        state = dev.jesd204_fsm_state
+
+        if verbose:
+            print(
+                "%s: DEVICE%d: Is <%s> in state <%s> with status <%d>"
+                % (dev.uri, index, "Paused" if paused else "Running", state, err)
+            )
+
+        if err:
+            print(
+                "\nERROR %s: DEVICE%d: Is <%s> in state <%s> with status <%d>\n"
+                % (dev.uri, index, "Paused" if paused else "Running", state, err)
+            )
+            return "error", state
+
+        state_last = state == "opt_post_running_stage"
+
+        if (state_last == 0) and (paused == 0):
+            return "running", state
+
+        if (state_last == 0) and (paused == 1):
+            return "paused", state
+
+        if (state_last == 1) and (paused == 0):
+            return "done", state
+
+        assert False
+
+    def _jesd204_fsm_sync(self):
+        """Run the JESD204 FSM of all devices to completion
+
+        The FSM of all devices is polled concurrently and paused devices are
+        resumed together. Polls back off from _jesd204_fsm_poll_min to
+        _jesd204_fsm_poll_max seconds while no device makes progress. The
+        time spent in each FSM state is kept in jesd204_fsm_timings.
+
+        returns: type=string
+            "done" when all devices finished or "error" if a device failed
+        """
+        devs = [self.primary] + self.secondaries
+        start = time.monotonic()
+        deadline = start + self._jesd204_fsm_timeout
+        delay = self._jesd204_fsm_poll_min
+        self.jesd204_fsm_timings = {}
+        last_state, state_start = None, start
+
+        def read(dev):
+            return self._device_is_running(
+                dev, devs.index(dev), self._jesd_fsm_show_status
+            )
+
+        while True:
+            results = self._map_devices(read)
+            now = time.monotonic()
+            statuses = [status for status, _ in results]
+            states = {state for _, state in results}
+            if len(states) > 1:
+                raise Exception(
+                    "JESD204 FSM states differ between devices: {}".format(
+                        [state for _, state in results]
+                    )
+                )
+            (state,) = states
+            if state != last_state:
+                if last_state is not None:
+                    self.jesd204_fsm_timings[last_state] = now - state_start
+                last_state, state_start = state, now
+                delay = self._jesd204_fsm_poll_min
+
+            if "error" in statuses or all(status == "done" for status in statuses):
+                self.jesd204_fsm_timings[state] = now - state_start
+                self.jesd204_fsm_timings["total"] = now - start
+                return "error" if "error" in statuses else "done"
+
+            if now >= deadline:
+                raise TimeoutError(
+                    "JESD204 FSM did not finish within {} s (state {})".format(
+                        self._jesd204_fsm_timeout, state
+                    )
+                )
+
+            # Resume paused devices together once none is still running
+            paused = [dev for dev, status in zip(devs, statuses) if status == "paused"]
+            if paused and "running" not in statuses:
+
+                def resume(dev):
+                    dev.jesd204_fsm_resume = "1"
+
+                self._map_devices(resume, paused)
+                delay = self._jesd204_fsm_poll_min
+            else:
+                time.sleep(min(delay, deadline - now))
+                delay = min(delay * 2, self._jesd204_fsm_poll_max)
+
+    def _retry_pre_rx_setup(self, setup, retries):
+        """Run the setup done before the first capture, reinitializing all
+        devices after a failure. Gives up after the given number of attempts
+        or once _pre_rx_setup_timeout seconds have passed. JESD204 FSM
+        timeouts are raised directly, since every retry would wait for
+        _jesd204_fsm_timeout seconds again.
+        """
+        deadline = time.monotonic() + self._pre_rx_setup_timeout
+        for _ in range(retries):
+            try:
+                setup()
+                return
+            except TimeoutError:
+                raise
+            except Exception as ex:
+                error = ex
+                if time.monotonic() >= deadline:
+                    break
+                print("Re-initializing due to lock-up")
+                self.reinitialize()
+        raise Exception("Unable to initialize (Board reboot required)") from error
+
+    def rx(self):
+        """Receive data from multiple hardware buffers for each channel index in
+        rx_enabled_channels of each child object (primary,secondaries[indx]).
+        Buffers of all devices are armed and refilled concurrently, with a
+        single sysref request aligning the captures. An error of any device
+        is raised as soon as it occurs.
+
+        returns: type=numpy.array or list of numpy.array
+            An array or list of arrays when more than one receive channel
+            is enabled containing samples from a channel or set of channels.
+            Data will be complex when using a complex data device.
+        """
+        if not self._rx_initialized:
+            self._pre_rx_setup()
+            self._rx_initialized = True
+        data = []
+        self._rx_dma_arm()
+        # Recreate all buffers, all devices must be armed before the sysref
+        self._map_devices(self._recreate_rx_buffer)
+
+        if self._resync_tx:
+            self._dds_sync_enable(1)
+
+        self.sysref_request()
+
+        # Refill all buffers concurrently, captures are aligned by the sysref
+        for samples in self._map_devices(lambda dev: dev.rx()):
+            data += samples
+        return data
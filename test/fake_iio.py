@@ -0,0 +1,245 @@
+"""Fake libiio objects for testing buffer and context handling without hardware
+
+Devices are built from fake channels holding raw hardware words. Buffers,
+streams and blocks use the sample interleaved layout of libiio and channel
+reads apply the shift and sign extension of the channel data format, so
+results can be compared against conversions done by pyadi-iio.
+"""
+
+import errno
+import weakref
+
+import numpy as np
+
+
+class data_format:
+    def __init__(self, length=16, bits=16, shift=0, is_signed=True, is_be=False):
+        self.length = length
+        self.bits = bits
+        self.shift = shift
+        self.is_signed = is_signed
+        self.is_be = is_be
+        self.repeat = 1
+
+
+class attr:
+    """Attribute counting accesses, optionally failing like a lost connection"""
+
+    def __init__(self, value, disconnected=None):
+        self._value = str(value)
+        self.reads = 0
+        self.writes = 0
+        self.disconnected = disconnected
+
+    @property
+    def value(self):
+        self.reads += 1
+        if self.disconnected and self.disconnected():
+            raise OSError(errno.EPIPE, "Broken pipe")
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self.writes += 1
+        self._value = str(value)
+
+
+def _word(df):
+    """Unsigned type of the raw hardware words of a data format"""
+    return np.dtype((">" if df.is_be else "<") + "u" + str(df.length // 8))
+
+
+class channel:
+    def __init__(
+        self, id, index, output=False, fmt=None, words=None, attrs=None, dev=None
+    ):
+        self.id = self._id = id
+        self.name = None
+        self.index = index
+        self.output = output
+        self.scan_element = words is not None or output
+        self.data_format = fmt or data_format()
+        # Raw hardware words returned by successive RX buffer refills
+        self.words = np.asarray(words if words is not None else [], dtype=np.int64)
+        self.attrs = {k: attr(v) for k, v in (attrs or {}).items()}
+        self.enabled = False
+        self.dev = dev
+
+    def read(self, buf, raw=False):
+        """Demux the samples of this channel, converting them unless raw"""
+        df = self.data_format
+        samples = np.frombuffer(buf.read(), dtype=buf.layout)[self.id]
+        values = samples.astype(np.int64)
+        if not raw:
+            values >>= df.shift
+            values &= (1 << df.bits) - 1
+            if df.is_signed:
+                sign = 1 << (df.bits - 1)
+                values = (values ^ sign) - sign
+        kind = "i" if df.is_signed else "u"
+        return bytearray(values.astype(kind + str(df.length // 8)).tobytes())
+
+
+class device:
+    def __init__(self, ctx, id, name, channels=(), attrs=None):
+        # libiio v0 devices only hold a weak reference to their context
+        self.ctx = weakref.ref(ctx)
+        self.id = id
+        self.name = name
+        self.channels = list(channels)
+        for chan in self.channels:
+            chan.dev = self
+        self.attrs = {k: attr(v) for k, v in (attrs or {}).items()}
+        self.debug_attrs = {}
+        self.regs = {}
+        self.pushes = []
+        self.refills = 0
+
+    def find_channel(self, name, output=False):
+        for chan in self.channels:
+            if chan.id == name and chan.output == output:
+                return chan
+        return None
+
+    def set_kernel_buffers_count(self, count):
+        pass
+
+    def reg_read(self, reg):
+        return self.regs.get(reg, 0)
+
+    def reg_write(self, reg, value):
+        self.regs[reg] = value
+
+
+class context:
+    def __init__(self, uri="local:"):
+        self.uri = uri
+        # Backend name, as reported by libiio
+        backend = uri.partition(":")[0]
+        self.name = {"ip": "network"}.get(backend, backend)
+        self.devices = []
+
+    def add_device(self, *args, **kwargs):
+        dev = device(self, *args, **kwargs)
+        self.devices.append(dev)
+        return dev
+
+    def find_device(self, name):
+        """Find a device, returning a new object each call like libiio"""
+        for dev in self.devices:
+            if name in (dev.id, dev.name):
+                wrapper = object.__new__(device)
+                wrapper.__dict__ = dev.__dict__
+                return wrapper
+        return None
+
+
+def _layout(channels):
+    """Structured type of one sample of a buffer, as laid out by libiio"""
+    names, formats, offsets = [], [], []
+    offset = 0
+    for chan in sorted(channels, key=lambda c: c.index):
+        length = chan.data_format.length // 8
+        offset += -offset % length
+        names.append(chan.id)
+        formats.append(_word(chan.data_format))
+        offsets.append(offset)
+        offset += length
+    return np.dtype(
+        {"names": names, "formats": formats, "offsets": offsets, "itemsize": offset}
+    )
+
+
+class _buffer:
+    """Buffer of a device, compatible with the libiio v0 and v1 APIs"""
+
+    def __init__(self, dev, size_or_mask, cyclic=False):
+        self.dev = dev
+        if isinstance(size_or_mask, channels_mask):
+            self.channels = list(size_or_mask.channels)
+            self.size = None
+        else:
+            self.channels = [c for c in dev.channels if c.enabled]
+            self.size = size_or_mask
+        self.layout = _layout(self.channels)
+        self.cyclic = cyclic
+        self.enabled = False
+        self._data = b""
+
+    def _fill(self, size):
+        """Fill the buffer with the next raw words of each channel"""
+        samples = np.zeros(size, dtype=self.layout)
+        start = self.dev.refills * size
+        for chan in self.channels:
+            idx = np.arange(start, start + size) % len(chan.words)
+            samples[chan.id] = chan.words[idx] & ((1 << chan.data_format.length) - 1)
+        self.dev.refills += 1
+        self._data = samples.tobytes()
+
+    def refill(self):
+        self._fill(self.size)
+
+    def read(self):
+        return bytearray(self._data)
+
+    def write(self, data):
+        self._data = bytes(data)
+        return len(self._data)
+
+    def push(self):
+        self.dev.pushes.append((self._data, self.cyclic))
+
+
+class channels_mask:
+    def __init__(self, dev):
+        self.dev = dev
+        self.channels = []
+
+
+class block:
+    def __init__(self, buf, size):
+        self.buf = buf
+        self.size = size
+        self.layout = buf.layout
+        # Blocks of TX streams are submitted as soon as they are written
+        self.submit = False
+        self._data = b""
+
+    def read(self):
+        return bytearray(self._data)
+
+    def write(self, data):
+        self._data = bytes(data)
+        if self.submit:
+            self.enqueue()
+
+    def enqueue(self, bytes_used=None, cyclic=False):
+        self.buf.dev.pushes.append((self._data, cyclic))
+
+
+class stream:
+    def __init__(self, buffer, nb_blocks, samples_count):
+        self.buffer = buffer
+        self.nb_blocks = nb_blocks
+        self.samples_count = samples_count
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        buf = self.buffer
+        blk = block(buf, self.samples_count)
+        if buf.channels[0].output:
+            blk.submit = True
+        else:
+            buf._fill(self.samples_count)
+            blk._data = buf._data
+        return blk
+
+
+def install(monkeypatch, iio):
+    """Replace the buffer classes of the iio module with fakes"""
+    monkeypatch.setattr(iio, "Buffer", _buffer, raising=False)
+    monkeypatch.setattr(iio, "ChannelsMask", channels_mask, raising=False)
+    monkeypatch.setattr(iio, "Stream", stream, raising=False)
+    monkeypatch.setattr(iio, "Block", block, raising=False)
@@ -0,0 +1,206 @@
+import timeit
+from test import fake_iio
+
+import pytest
+
+import adi
+import adi.context_manager as cm
+
+hardware = ["adar1000"]
+
+N = 20
+
+
+def make_array(uri):
+    return adi.adar1000_array(
+        uri=uri,
+        chip_ids=["csb1_chip1", "csb1_chip2", "csb1_chip3", "csb1_chip4"],
+        device_map=[[1, 2], [3, 4]],
+        element_map=[[1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 12], [13, 14, 15, 16]],
+        device_element_map={
+            1: [5, 6, 2, 1],
+            2: [7, 8, 4, 3],
+            3: [13, 14, 10, 9],
+            4: [15, 16, 12, 11],
+        },
+    )
+
+
+def per_call_ms(func):
+    """Best per call time of func in milliseconds"""
+    return min(timeit.repeat(func, number=N, repeat=3)) / N * 1e3
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware)
+def test_adar1000_array_steer_time(iio_uri):
+    array = make_array(iio_uri)
+
+    def per_element():
+        # Steering as done before phases were computed for the whole array
+        az_phi, el_phi = array.calculate_phi(30, 0)
+        for element in array.elements.values():
+            element.rx_phase = element.column * az_phi + element.row * el_phi
+        array.latch_rx_settings()
+
+    def steer():
+        array.steer_rx(30, 0)
+
+    per_element()
+    expected = array.all_rx_phases
+    steer()
+    assert array.all_rx_phases == expected
+    before = per_call_ms(per_element)
+    after = per_call_ms(steer)
+    print("\nsteer_rx: per element {:.2f} ms, array {:.2f} ms".format(before, after))
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware)
+def test_adar1000_array_all_gains(iio_uri):
+    array = make_array(iio_uri)
+    gains = [[(r * 4 + c) * 8 for c in range(4)] for r in range(4)]
+    array.all_rx_gains = gains
+    assert array.all_rx_gains == gains
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware)
+def test_adar1000_array_beam_table(iio_uri):
+    array = make_array(iio_uri)
+    beams = [(azimuth, 0) for azimuth in range(-60, 61, 2)]
+    array.load_beam_table(beams)
+
+    def sweep_steer():
+        for beam in beams:
+            array.steer_rx(*beam)
+
+    def sweep_table():
+        for index in range(len(beams)):
+            array.select_rx_beam(index)
+
+    sweep_table()
+    assert (array.rx_azimuth, array.rx_elevation) == beams[-1]
+    before = per_call_ms(sweep_steer)
+    after = per_call_ms(sweep_table)
+    print(
+        "\nazimuth sweep: steer_rx {:.1f} ms, beam table {:.1f} ms".format(
+            before, after
+        )
+    )
+    with pytest.raises(ValueError):
+        array.select_rx_beam(len(beams))
+
+
+class driver_attrs(dict):
+    """Attributes of a fake driver, created on first access"""
+
+    def __missing__(self, key):
+        self[key] = value = fake_iio.attr("0")
+        return value
+
+
+class mem_ctrl_attr(fake_iio.attr):
+    """Driver attribute of bits of MEM_CTRL (0x38), set by writing 0 if
+    inverted like the RAM bypass bits"""
+
+    def __init__(self, dev, mask, invert):
+        super().__init__("0")
+        self.dev = dev
+        self.mask = mask
+        self.invert = invert
+
+    @property
+    def value(self):
+        self.reads += 1
+        return str(int(bool(self.dev.regs[0x38] & self.mask) != self.invert))
+
+    @value.setter
+    def value(self, value):
+        self.writes += 1
+        if (int(value) != 0) != self.invert:
+            self.dev.regs[0x38] |= self.mask
+        else:
+            self.dev.regs[0x38] &= ~self.mask
+
+
+def add_fake_device(ctx, label):
+    channels = [
+        fake_iio.channel("voltage{}".format(i), i, output=output)
+        for i in range(4)
+        for output in (False, True)
+    ]
+    for chan in channels:
+        chan.attrs = driver_attrs()
+    dev = ctx.add_device("iio:device{}".format(len(ctx.devices)), "adar1000", channels)
+    dev.attrs = driver_attrs(label=fake_iio.attr(label))
+    # Beam and bias memory bypassed after reset
+    dev.regs[0x38] = 0x60
+    dev.attrs["beam_mem_enable"] = mem_ctrl_attr(dev, 0x40, True)
+    dev.attrs["bias_mem_enable"] = mem_ctrl_attr(dev, 0x20, True)
+    dev.attrs["common_mem_enable"] = mem_ctrl_attr(dev, 0x03, False)
+    return dev
+
+
+def make_fake_array(monkeypatch):
+    ctx = fake_iio.context("ip:adar1000")
+    for i in range(4):
+        add_fake_device(ctx, "csb1_chip{}".format(i + 1))
+    monkeypatch.setattr(cm, "_contexts", {})
+    monkeypatch.setattr(cm.iio, "Context", lambda uri: ctx, raising=False)
+    return make_array("ip:adar1000")
+
+
+#########################################
+def test_adar1000_initialize_common_mem(monkeypatch):
+    array = make_fake_array(monkeypatch)
+    for device in array.devices.values():
+        attrs = device._ctrl.attrs
+        attrs["common_mem_enable"].value = 1
+        writes = attrs["bias_enable"].writes
+        device.initialize()
+        # initialize() disables the common memory. The bias DACs are only
+        # written once, to enable them
+        assert attrs["common_mem_enable"].writes == 2
+        assert not device.common_mem_enable
+        assert attrs["bias_enable"].writes == writes + 1
+        assert device.bias_dac_enable
+
+
+def beam_sources(array):
+    """Sources of the Rx and Tx beams of each device, from MEM_CTRL"""
+    sources = []
+    for device in array.devices.values():
+        mem_ctrl = device._ctrl.regs[0x38]
+        sources.append(
+            tuple(
+                "spi" if mem_ctrl & (0x40 | bypass) else "memory"
+                for bypass in (0x01, 0x02)
+            )
+        )
+    return set(sources)
+
+
+#########################################
+def test_adar1000_array_beam_sources(monkeypatch):
+    array = make_fake_array(monkeypatch)
+    array.load_beam_table([(0, 0), (20, 0)], "rx")
+    array.load_beam_table([(0, 0), (-20, 0)], "tx")
+
+    array.steer_rx(30, 0)
+    phases = array.all_rx_phases
+    array.select_tx_beam(1)
+    # Selecting a Tx beam keeps the Rx phases steered over SPI
+    assert beam_sources(array) == {("spi", "memory")}
+    assert array.all_rx_phases == phases
+
+    array.steer_tx(10, 0)
+    assert beam_sources(array) == {("spi", "spi")}
+    array.select_rx_beam(1)
+    assert beam_sources(array) == {("memory", "spi")}
+    array.select_tx_beam(0)
+    assert beam_sources(array) == {("memory", "memory")}
+    array.steer_tx(10, 0)
+    assert beam_sources(array) == {("memory", "spi")}
+    for device in array.devices.values():
+        assert int(device.common_rx_beam_state) == 1
@@ -876,3 +876,20 @@ def test_adrv9009_jesd(iio_uri):
     sdr = adi.adrv9009(iio_uri, jesd_monitor=True)
     info = sdr._jesd.get_all_statuses()
     assert info
+
+
+#########################################
+@pytest.mark.skipif(skip_jesd, reason="JESD module not importable")
+@pytest.mark.iio_hardware(hardware, True)
+def test_adrv9009_jesd_link_monitor(iio_uri):
+    import adi
+
+    sdr = adi.adrv9009(iio_uri, jesd_monitor=True)
+    monitor = adi.jesd_link_monitor([sdr._jesd], history=4)
+    assert monitor.poll() == []
+    for _ in range(5):
+        monitor.poll()
+    assert monitor.states[(sdr._jesd.address, None, None)]["poll"] == "ok"
+    history = monitor.lane_history()
+    assert history["errors"].shape == (4, len(monitor.lanes))
+    assert list(history["time"]) == sorted(history["time"])
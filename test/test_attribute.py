@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+from test import fake_iio
+
+from adi.attribute import _context_executor, attribute
+
+
+def make_context():
+    """Context with two devices of the same name, as in multi-chip boards"""
+    ctx = fake_iio.context()
+    for i in range(2):
+        chan = fake_iio.channel("voltage0", 0, attrs={"hardwaregain": i})
+        ctx.add_device(
+            "iio:device{}".format(i), "ad9081", [chan], attrs={"nco": 100 * i}
+        )
+    return ctx
+
+
+class fake_attribute(attribute):
+    def __init__(self, ctx):
+        self._ctx = ctx
+        self._ctrl = ctx.find_device("iio:device0")
+
+
+#########################################
+def test_snapshot_restore_same_name_devices():
+    ctx = make_context()
+    dev = fake_attribute(ctx)
+    snap = dev.snapshot()
+    assert sorted(snap) == ["iio:device0", "iio:device1"]
+
+    for d in ctx.devices:
+        d.attrs["nco"].value = "5"
+        d.channels[0].attrs["hardwaregain"].value = "7"
+    result = dev.restore(snap)
+    assert result == {"written": 4, "skipped": 0, "failed": []}
+    for i, d in enumerate(ctx.devices):
+        assert d.attrs["nco"].value == str(100 * i)
+        assert d.channels[0].attrs["hardwaregain"].value == str(i)
+
+
+#########################################
+def test_attr_cache_ttl_per_object():
+    ctx = make_context()
+    nco = ctx.devices[0].attrs["nco"]
+    a = fake_attribute(ctx)
+    b = fake_attribute(ctx)
+    a.attr_cache_ttl = 60
+    b.attr_cache_ttl = 0.05
+    a._get_iio_dev_attr("nco")
+    b._get_iio_dev_attr("nco")
+    assert nco.reads == 1
+
+    # Values cached by another object are only used within the reader's TTL
+    time.sleep(0.1)
+    b._get_iio_dev_attr("nco")
+    a._get_iio_dev_attr("nco")
+    assert nco.reads == 2
+
+
+#########################################
+def test_attr_cache_clear_own_devices():
+    ctx, other_ctx = make_context(), make_context()
+    a = fake_attribute(ctx)
+    other = fake_attribute(other_ctx)
+    for dev in [a, other]:
+        dev.attr_cache_ttl = 60
+        dev._get_iio_dev_attr("nco")
+    a.attr_cache_clear()
+    a._get_iio_dev_attr("nco")
+    other._get_iio_dev_attr("nco")
+    assert ctx.devices[0].attrs["nco"].reads == 2
+    assert other_ctx.devices[0].attrs["nco"].reads == 1
+
+
+#########################################
+def test_attr_cache_settings_per_object():
+    ctx = make_context()
+    a = fake_attribute(ctx)
+    b = fake_attribute(ctx)
+    a.attr_cache_ttls["nco"] = 1
+    a.attr_cache_volatile.append("nco")
+    assert a.attr_cache_ttls == {"nco": 1} and "nco" in a.attr_cache_volatile
+    assert b.attr_cache_ttls == {} and "nco" not in b.attr_cache_volatile
+    assert attribute._attr_cache_ttls == {}
+
+
+class threaded_attribute(fake_attribute):
+    """Records the threads its property is accessed from"""
+
+    def __init__(self, ctx):
+        super().__init__(ctx)
+        self.threads = []
+
+    @property
+    def nco(self):
+        self.threads.append(threading.current_thread())
+        return self._get_iio_dev_attr("nco")
+
+    @nco.setter
+    def nco(self, value):
+        self.threads.append(threading.current_thread())
+        self._set_iio_dev_attr("nco", value)
+
+
+#########################################
+def test_async_attr_on_context_executor():
+    ctx, other_ctx = make_context(), make_context()
+    a = threaded_attribute(ctx)
+    b = threaded_attribute(other_ctx)
+
+    async def main():
+        await a.aset_attr("nco", 5)
+        return await asyncio.gather(a.aget_attr("nco"), b.aget_attr("nco"))
+
+    assert asyncio.run(main()) == [5, 0]
+    worker = _context_executor(ctx).submit(threading.current_thread).result()
+    other_worker = _context_executor(other_ctx).submit(threading.current_thread)
+    assert a.threads == [worker, worker]
+    assert b.threads == [other_worker.result()]
+    assert worker is not other_worker.result()
+    assert threading.main_thread() not in a.threads + b.threads
@@ -0,0 +1,70 @@
+import re
+import timeit
+
+import pytest
+
+import adi
+from adi.attribute import get_numbers
+
+hardware = ["pluto", "adrv9361", "fmcomms2"]
+
+N = 2000
+
+
+def per_access_us(func):
+    """Best per call time of func in microseconds"""
+    return min(timeit.repeat(func, number=N, repeat=5)) / N * 1e6
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware, True)
+def test_attribute_accessor_overhead(iio_uri):
+    dev = adi.ad9361(iio_uri)
+    ctrl = dev._ctrl
+
+    def lookup_per_call():
+        # Attribute access as done before accessors were resolved once
+        return ctrl.find_channel("altvoltage0", True).attrs["frequency"].value
+
+    def accessor():
+        return dev._get_iio_attr_str("altvoltage0", "frequency", True)
+
+    assert lookup_per_call() == accessor()
+    before = per_access_us(lookup_per_call)
+    after = per_access_us(accessor)
+    print(
+        "\nchannel attribute read: find_channel {:.1f} us, accessor {:.1f} us".format(
+            before, after
+        )
+    )
+
+
+#########################################
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2400000000",
+        "30.720000",
+        "71.000000 dB",
+        "[70000000 1 6000000000]",
+        "-1 0 1 2 3 4 5 6",
+        " ".join(str(i * 1e6) for i in range(16)),
+    ],
+)
+def test_get_numbers_overhead(value):
+    def regex():
+        v = re.findall(r"[-+]?[.]?[\d]+(?:,\d\d\d)*[\.]?\d*(?:[eE][-+]?\d+)?", value)
+        v = [float(i) for i in v]
+        if len(v) == 1:
+            v = v[0]
+            if int(v) == v:
+                v = int(v)
+        return v
+
+    def parser():
+        return get_numbers(value)
+
+    assert regex() == parser()
+    before = per_access_us(regex)
+    after = per_access_us(parser)
+    print("\n{}: regex {:.2f} us, get_numbers {:.2f} us".format(value, before, after))
@@ -0,0 +1,125 @@
+import errno
+import gc
+from test import fake_iio
+
+import pytest
+
+import adi.context_manager as cm
+
+
+class unreadable_attr:
+    @property
+    def value(self):
+        raise OSError(errno.EINVAL, "Invalid argument")
+
+
+class fake_network:
+    """Contexts opened by URI, whose connections can be dropped"""
+
+    def __init__(self):
+        self.opened = []
+        self.down = set()
+
+    def __call__(self, uri):
+        ctx = fake_iio.context(uri)
+        dev = ctx.add_device("iio:device0", "adc")
+        dev.attrs["name"] = fake_iio.attr("adc", disconnected=lambda: ctx in self.down)
+        self.opened.append(ctx)
+        return ctx
+
+
+@pytest.fixture
+def network(monkeypatch):
+    monkeypatch.setattr(cm, "_contexts", {})
+    monkeypatch.setattr(cm, "_reconnects", 0)
+    net = fake_network()
+    monkeypatch.setattr(cm.iio, "Context", net, raising=False)
+    monkeypatch.setattr(cm.iio, "Device", fake_iio.device, raising=False)
+    return net
+
+
+class fake_dev(cm.context_manager):
+    _ctx_shared = True
+
+
+#########################################
+def test_context_shared_and_released(network):
+    a = fake_dev("ip:192.168.2.1")
+    b = fake_dev("ip:192.168.2.1")
+    c = fake_dev("usb:1.2.3")
+    assert a.ctx is b.ctx and a.ctx is not c.ctx
+    assert len(network.opened) == 2
+    assert cm.context_stats() == {
+        "contexts": 2,
+        "sockets": 1,
+        "references": {"ip:192.168.2.1": 2, "usb:1.2.3": 1},
+        "reconnects": 0,
+    }
+
+    # Each object releases its own reference, the last one closes the context
+    del a
+    gc.collect()
+    assert cm.context_stats()["references"] == {"ip:192.168.2.1": 1, "usb:1.2.3": 1}
+    del b, c
+    gc.collect()
+    assert cm.context_stats()["contexts"] == 0
+
+
+#########################################
+def test_context_not_shared(network):
+    # Sharing is opt-in, as settings like the timeout apply to the context
+    a = cm.context_manager("ip:192.168.2.1")
+    b = cm.context_manager("ip:192.168.2.1")
+    assert a.ctx is not b.ctx
+    assert cm.context_stats()["contexts"] == 0
+
+
+#########################################
+def test_context_dead_reopened(network):
+    class checked(fake_dev):
+        _ctx_check_interval = -1
+
+        def __init__(self, uri):
+            super().__init__(uri)
+            self._ctrl = self._ctx.find_device("adc")
+            self._devs = [self._ctrl, "adc"]
+
+    a = checked("ip:192.168.2.1")
+    old = a.ctx
+    # A responding context is kept
+    b = checked("ip:192.168.2.1")
+    assert b.ctx is old
+
+    # Holders of the dead context move to the new one with their devices
+    network.down.add(old)
+    c = checked("ip:192.168.2.1")
+    new = network.opened[-1]
+    assert len(network.opened) == 2 and new is not old
+    for obj in [a, b, c]:
+        assert obj.ctx is new
+        assert obj._ctrl.ctx() is new and obj._devs[0].ctx() is new
+        assert obj._devs[1] == "adc"
+    stats = cm.context_stats()
+    assert stats["references"] == {"ip:192.168.2.1": 3}
+    assert stats["reconnects"] == 1
+
+    del a, b
+    gc.collect()
+    assert cm.context_stats()["references"] == {"ip:192.168.2.1": 1}
+    del c, obj
+    gc.collect()
+    assert cm.context_stats()["contexts"] == 0
+
+
+#########################################
+def test_context_alive(network):
+    ctx = network("ip:192.168.2.1")
+    assert cm._context_alive(ctx)
+    network.down.add(ctx)
+    assert not cm._context_alive(ctx)
+
+    # Attributes that cannot be read are skipped
+    ctx.devices[0].attrs = {"a": unreadable_attr(), "b": fake_iio.attr("1")}
+    assert cm._context_alive(ctx)
+    ctx.devices[0].attrs = {"a": unreadable_attr()}
+    assert cm._context_alive(ctx)
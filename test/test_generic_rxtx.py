@@ -1,4 +1,5 @@
 import iio
+import numpy as np
 import pytest
 
 import adi
@@ -103,3 +104,94 @@ def test_generic_rx_with_ctx_pv(iio_uri):
     assert dev._rxadc
     assert dev._txdac
     assert dev._ctrl
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware, True)
+def test_generic_rx_zero_copy(iio_uri):
+    dev = adi.ad9361(uri=iio_uri)
+    dev.rx_enabled_channels = [0, 1]
+    dev.rx_buffer_size = 2 ** 12
+    dev.rx_zero_copy = True
+    data = dev.rx()
+    assert len(data) == 2
+    for chan in data:
+        assert chan.dtype == np.complex64
+        assert len(chan) == 2 ** 12
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware, True)
+def test_generic_rx_out(iio_uri):
+    dev = adi.ad9361(uri=iio_uri)
+    dev.rx_enabled_channels = [0, 1]
+    dev.rx_buffer_size = 2 ** 12
+    out = [np.zeros(2 ** 12, dtype=np.complex128) for _ in range(2)]
+    data = dev.rx(out=out)
+    assert data is out
+
+    dev.rx_output_ring_size = 2
+    first = dev.rx()
+    second = dev.rx()
+    third = dev.rx()
+    assert not np.shares_memory(first[0], second[0])
+    assert np.shares_memory(first[0], third[0])
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware, True)
+def test_generic_rx_streaming(iio_uri):
+    dev = adi.ad9361(uri=iio_uri)
+    dev.rx_buffer_size = 2 ** 12
+    dev.rx_streaming_start(queue_depth=2)
+    for _ in range(4):
+        data = dev.rx_streaming_get(timeout=10)
+        assert len(data) == 2 ** 12
+    dev.rx_streaming_stop()
+    assert not dev.rx_streaming
+    assert dev.rx_streaming_stats["blocks"] >= 4
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware, True)
+def test_generic_rx_async(iio_uri):
+    import asyncio
+
+    dev = adi.ad9361(uri=iio_uri)
+    dev.rx_buffer_size = 2 ** 12
+
+    async def capture():
+        size = await dev.aget_attr("rx_buffer_size")
+        data = await dev.rx_async()
+        return size, data
+
+    size, data = asyncio.run(capture())
+    assert size == 2 ** 12
+    assert len(data) == 2 ** 12
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware, True)
+def test_generic_rx_iter(iio_uri):
+    dev = adi.ad9361(uri=iio_uri)
+    dev.rx_buffer_size = 2 ** 12
+    dev.rx_buffer_num_blocks = 8
+    blocks = list(dev.rx_iter(3))
+    assert len(blocks) == 3
+    for data in blocks:
+        assert len(data) == 2 ** 12
+
+
+#########################################
+@pytest.mark.iio_hardware(hardware, True)
+def test_generic_snapshot_restore(iio_uri, tmp_path):
+    dev = adi.ad9361(iio_uri)
+    filename = str(tmp_path / "snapshot.json")
+    snap = dev.snapshot(filename)
+    assert dev._ctrl.id in snap
+
+    lo = dev.rx_lo
+    dev.rx_lo = lo + 10000000
+    result = dev.restore(filename)
+    assert result["written"] >= 1
+    assert dev.rx_lo == lo
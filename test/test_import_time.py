@@ -0,0 +1,73 @@
+import subprocess
+import sys
+
+import pytest
+
+import adi
+
+
+def import_time_us(statement):
+    """Best time of a statement in a fresh interpreter in microseconds"""
+    code = "import time; t = time.perf_counter(); {}; print(time.perf_counter() - t)"
+    times = [
+        float(subprocess.check_output([sys.executable, "-c", code.format(statement)]))
+        for _ in range(5)
+    ]
+    return min(times) * 1e6
+
+
+#########################################
+def test_import_time():
+    lazy = import_time_us("import adi")
+    eager = import_time_us(
+        "import adi; [getattr(adi, n, None) for n in adi._lazy_imports]"
+    )
+    print("\nimport adi: {:.0f} us, all device classes {:.0f} us".format(lazy, eager))
+
+
+#########################################
+def test_import_is_lazy():
+    code = "import adi, sys; print([m for m in sys.modules if m.startswith('adi.')])"
+    loaded = subprocess.check_output([sys.executable, "-c", code]).decode()
+    assert loaded.strip() == "[]"
+
+
+#########################################
+@pytest.mark.parametrize("name", sorted(adi._lazy_imports))
+def test_lazy_names(name):
+    value = getattr(adi, name)
+    if value is None:
+        # jesd is None when its optional dependencies are missing
+        pytest.skip("{} not available".format(name))
+    assert value.__name__ == name
+    assert name in dir(adi)
+
+
+#########################################
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "adi.rx_tx.rx_tx_def.__name__",
+        "adi.attribute.attribute.__name__",
+        "adi.context_manager.context_manager.__name__",
+    ],
+)
+def test_submodules(statement):
+    # Submodules are reachable from the package without importing them
+    code = "import adi; print({})".format(statement)
+    name = subprocess.check_output([sys.executable, "-c", code]).decode()
+    assert name.strip() == statement.split(".")[-2]
+
+
+#########################################
+def test_sshfs_submodule():
+    pytest.importorskip("paramiko")
+    code = "import adi; print(adi.sshfs.sshfs.__name__)"
+    name = subprocess.check_output([sys.executable, "-c", code]).decode()
+    assert name.strip() == "sshfs"
+
+
+#########################################
+def test_missing_attribute():
+    with pytest.raises(AttributeError, match="no attribute 'not_a_module'"):
+        adi.not_a_module
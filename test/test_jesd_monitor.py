@@ -0,0 +1,110 @@
+import threading
+
+import pytest
+
+pytest.importorskip("paramiko")
+
+from adi.jesd_internal import jesd, jesd_link_monitor  # noqa: E402
+
+# Captured from /sys/bus/platform/devices/*-jesd204-rx/status
+link_status = """Link is enabled
+Measured Link Clock: 250.000 MHz
+Reported Link Clock: 250.000 MHz
+Measured Device Clock: 250.000 MHz
+Reported Device Clock: 250.000 MHz
+Desired Device Clock: 250.000 MHz
+Lane rate: 10000.000 MHz
+Lane rate / 40: 250.000 MHz
+LMFC rate: 15.625 MHz
+Link status: DATA
+SYSREF captured: Yes
+SYSREF alignment error: No
+"""
+
+# Captured from /sys/bus/platform/devices/*-jesd204-rx/lane0_info
+lane_info = """Errors: 0
+CGS state: DATA
+Initial Frame Synchronization: Yes
+Lane Latency: 1 Multi-frames and 60 Octets
+Initial Lane Alignment Sequence: Yes
+DID: 0, BID: 0, LID: 0, L: 4, M: 8, F: 4, S: 1, K: 32, N: 16, N': 16, CS: 0
+FC: 10000000, HD: 0, CF: 0, ADJCNT: 0, PHADJ: 0, ADJDIR: 0, JESDV: 1, SUBCLASS: 1
+"""
+
+
+def decode_status(status):
+    """Decoding as done before decode_status used str.partition"""
+    link = {}
+    for s in status.replace(",", "\n").split("\n"):
+        if ":" in s:
+            o = s.split(":")
+            link[o[0].strip().replace("/", "")] = o[1].strip()
+        if "Link is" in s:
+            link["enabled"] = s.split(" ")[-1].strip()
+    return link
+
+
+#########################################
+@pytest.mark.parametrize("status", [link_status, lane_info])
+def test_jesd_decode_status(status):
+    decoded = jesd.__new__(jesd).decode_status(status)
+    assert decoded == decode_status(status)
+
+
+#########################################
+def test_jesd_decode_status_fields():
+    j = jesd.__new__(jesd)
+    link = j.decode_status(link_status)
+    assert link["enabled"] == "enabled"
+    assert link["Link status"] == "DATA"
+    assert link["Lane rate  40"] == "250.000 MHz"
+    assert link["SYSREF captured"] == "Yes"
+    lane = j.decode_status(lane_info)
+    assert lane["Errors"] == "0"
+    assert lane["CGS state"] == "DATA"
+    assert lane["Initial Lane Alignment Sequence"] == "Yes"
+    assert lane["L"] == "4" and lane["SUBCLASS"] == "1"
+
+
+class fake_jesd:
+    """Board with one link of two lanes reporting the captured statuses"""
+
+    def __init__(self, address):
+        self.address = address
+        self.lanes = {"axi-jesd204-rx": ["/lane0_info", "/lane1_info"]}
+        self.reads = 0
+
+    def get_all_statuses(self):
+        self.reads += 1
+        return {"axi-jesd204-rx": decode_status(link_status)}
+
+    def get_all_link_statuses(self):
+        lanes = {"lane0_info": decode_status(lane_info)}
+        lanes["lane1_info"] = dict(lanes["lane0_info"], Errors=str(self.reads))
+        return {"axi-jesd204-rx": lanes}
+
+
+def monitor_workers():
+    return [t for t in threading.enumerate() if t.name.startswith("pyadi-iio-jesd")]
+
+
+#########################################
+def test_jesd_link_monitor_stop():
+    boards = [fake_jesd("192.168.2.1"), fake_jesd("192.168.2.2")]
+    with jesd_link_monitor(boards, interval=0.01) as monitor:
+        assert monitor._thread.is_alive()
+    assert monitor._thread is None and monitor._executor is None
+    assert not monitor_workers()
+
+    # Polling after stopping starts new workers, stopping again joins them
+    monitor.poll()
+    events = monitor.poll()
+    assert [(e["board"], e["lane"], e["field"]) for e in events] == [
+        (b.address, "lane1_info", "Errors") for b in boards
+    ]
+    monitor.stop()
+    assert not monitor_workers()
+
+    monitor.start()
+    monitor.stop()
+    assert not monitor_workers()
@@ -0,0 +1,524 @@
+import threading
+import time
+from test import fake_iio
+
+import numpy as np
+import pytest
+
+import adi.compat as cl
+from adi.rx_tx import rx_core, tx_core
+
+compats = [cl.compat_libiio_v0_rx, cl.compat_libiio_v1_rx]
+tx_compats = [cl.compat_libiio_v0_tx, cl.compat_libiio_v1_tx]
+
+# 12 bit samples stored in the upper bits of 16 bit words
+values = np.array([-2048, -1000, -1, 0, 1, 7, 1000, 2047] * 4)
+fmt = dict(length=16, bits=12, shift=4, is_signed=True)
+
+
+def make_context(complex_data=False):
+    ctx = fake_iio.context()
+    names = ["voltage0_i", "voltage0_q"] if complex_data else ["voltage0", "voltage1"]
+    channels = []
+    for index, name in enumerate(names):
+        # Fill the unused low bits so samples that are not shifted differ
+        words = (np.roll(values, index) << 4) | 0x5
+        channels.append(
+            fake_iio.channel(
+                name,
+                index,
+                fmt=fake_iio.data_format(**fmt),
+                words=words,
+                attrs={"scale": "0.5", "offset": "2"},
+            )
+        )
+    ctx.add_device("iio:device0", "adc", channels)
+    return ctx, names
+
+
+def make_rx(monkeypatch, compat, complex_data=False, size=8):
+    fake_iio.install(monkeypatch, cl.iio)
+    ctx, names = make_context(complex_data)
+
+    class fake_rx(compat, rx_core):
+        _rx_channel_names = names
+        _rx_complex_data = complex_data
+        # Declared like drivers do, must not shift converted samples again
+        _rx_shift = fmt["shift"]
+
+    dev = fake_rx.__new__(fake_rx)
+    dev._ctx = ctx
+    dev._rxadc = dev._ctrl = ctx.find_device("adc")
+    rx_core.__init__(dev, size)
+    return dev
+
+
+def expected_si(index, size=8):
+    """SI samples as computed before conversions were vectorized"""
+    return 0.5 * (np.roll(values, index)[:size] + 2)
+
+
+#########################################
+@pytest.mark.parametrize("compat", compats)
+@pytest.mark.parametrize("zero_copy", [False, True])
+def test_rx_si_shift_applied_once(monkeypatch, compat, zero_copy):
+    dev = make_rx(monkeypatch, compat)
+    dev.rx_zero_copy = zero_copy
+    dev.rx_enabled_channels = [0, 1]
+    dev.rx_output_type = "SI"
+    data = dev.rx()
+    for index, x in enumerate(data):
+        np.testing.assert_allclose(x, expected_si(index))
+
+
+#########################################
+@pytest.mark.parametrize("compat", compats)
+@pytest.mark.parametrize("zero_copy", [False, True])
+def test_rx_si_shift_applied_once_complex(monkeypatch, compat, zero_copy):
+    dev = make_rx(monkeypatch, compat, complex_data=True)
+    dev.rx_zero_copy = zero_copy
+    dev.rx_output_type = "SI"
+    data = dev.rx()
+    np.testing.assert_allclose(data.real, expected_si(0))
+    np.testing.assert_allclose(data.imag, expected_si(1))
+
+
+class round_trips:
+    """Reads of raw attributes and the most of them in flight at once"""
+
+    def __init__(self, latency=0.005, fail_at=None):
+        self.latency = latency
+        self.fail_at = fail_at
+        self.lock = threading.Lock()
+        self.reads = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+
+class raw_attr:
+    """Raw attribute returning 1000 * channel + sample period"""
+
+    def __init__(self, trips, index):
+        self.trips = trips
+        self.index = index
+        self.reads = 0
+
+    @property
+    def value(self):
+        trips = self.trips
+        with trips.lock:
+            trips.reads += 1
+            trips.in_flight += 1
+            trips.max_in_flight = max(trips.max_in_flight, trips.in_flight)
+        time.sleep(trips.latency)
+        with trips.lock:
+            trips.in_flight -= 1
+        if self.index == 1 and self.reads == trips.fail_at:
+            raise OSError("read failed")
+        self.reads += 1
+        return str(1000 * self.index + self.reads - 1)
+
+
+def make_unbuffered_rx(trips, channels=4, size=10, uri="local:"):
+    ctx = fake_iio.context(uri)
+    names = ["voltage{}".format(i) for i in range(channels)]
+    dev = ctx.add_device(
+        "iio:device0", "adc", [fake_iio.channel(n, i) for i, n in enumerate(names)]
+    )
+    for i, chan in enumerate(dev.channels):
+        chan.attrs["raw"] = raw_attr(trips, i)
+
+    class fake_rx(cl.compat_libiio_v0_rx, rx_core):
+        _rx_channel_names = names
+        _rx_unbuffered_data = True
+        _rx_data_type = np.int32
+
+    rx = fake_rx.__new__(fake_rx)
+    # Devices only hold a weak reference to their context
+    rx._ctx = ctx
+    rx._rxadc = rx._ctrl = ctx.find_device("adc")
+    rx_core.__init__(rx, size)
+    rx.rx_enabled_channels = list(range(channels))
+    return rx
+
+
+@pytest.fixture
+def libiio_v1(monkeypatch):
+    monkeypatch.setattr(cl, "_is_libiio_v1", lambda: True)
+
+
+#########################################
+def test_rx_unbuffered_round_trips(libiio_v1):
+    trips = round_trips()
+    dev = make_unbuffered_rx(trips, uri="ip:192.168.2.1")
+    data = dev.rx()
+    # Each channel is read once per sample period, in the same period
+    assert trips.reads == 4 * 10
+    for i, x in enumerate(data):
+        np.testing.assert_array_equal(x, 1000 * i + np.arange(10))
+    # Reads of a period overlap, taking one round trip instead of four
+    assert trips.max_in_flight == 4
+    timestamps = dev.rx_unbuffered_timestamps
+    assert len(timestamps) == 10 and np.all(np.diff(timestamps) > 0)
+
+    # Workers are kept with the context instead of started per capture
+    workers = threading.active_count()
+    dev.rx()
+    assert threading.active_count() == workers
+    assert trips.max_in_flight == 4
+
+
+#########################################
+@pytest.mark.parametrize("uri, v1", [("local:", True), ("ip:192.168.2.1", False)])
+def test_rx_unbuffered_serial(monkeypatch, uri, v1):
+    # libiio v0 serializes requests of a context and local reads are cheap
+    monkeypatch.setattr(cl, "_is_libiio_v1", lambda: v1)
+    trips = round_trips(latency=0)
+    workers = threading.active_count()
+    data = make_unbuffered_rx(trips, uri=uri).rx()
+    for i, x in enumerate(data):
+        np.testing.assert_array_equal(x, 1000 * i + np.arange(10))
+    assert trips.max_in_flight == 1
+    assert threading.active_count() == workers
+
+
+#########################################
+def test_rx_unbuffered_benchmark(libiio_v1):
+    # Reads with a 5 ms round trip, as over a network connection
+    timings = {}
+    for uri in ["usb:1.2.3", "local:"]:
+        dev = make_unbuffered_rx(round_trips(), uri=uri)
+        start = time.perf_counter()
+        dev.rx()
+        timings[uri] = (time.perf_counter() - start) / dev.rx_buffer_size
+    print(
+        "unbuffered 4 channels: overlapped {:.1f} ms, serial {:.1f} ms per "
+        "sample".format(timings["usb:1.2.3"] * 1e3, timings["local:"] * 1e3)
+    )
+    assert timings["usb:1.2.3"] < timings["local:"] / 2
+
+
+#########################################
+@pytest.mark.parametrize("uri", ["local:", "ip:192.168.2.1"])
+def test_rx_unbuffered_read_error(libiio_v1, uri):
+    trips = round_trips(latency=0, fail_at=3)
+    dev = make_unbuffered_rx(trips, uri=uri)
+    with pytest.raises(OSError, match="read failed"):
+        dev.rx()
+    # Reads of the failed period finished before the error was raised
+    assert trips.in_flight == 0
+
+
+def as_list(data):
+    """Arrays of all enabled channels, keeping the dtype of each"""
+    return data if isinstance(data, list) else [data]
+
+
+def first(data):
+    """Array of the first enabled channel"""
+    return as_list(data)[0]
+
+
+def assert_same_data(data, expected):
+    data, expected = np.atleast_2d(data), np.atleast_2d(expected)
+    assert data.dtype == expected.dtype
+    np.testing.assert_array_equal(data, expected)
+
+
+def make_pair(monkeypatch, compat, complex_data, output_type):
+    """Device under test and a device reading the same data per channel"""
+    devs = [make_rx(monkeypatch, compat, complex_data) for _ in range(2)]
+    for dev in devs:
+        dev.rx_output_type = output_type
+        if not complex_data:
+            dev.rx_enabled_channels = [0, 1]
+    return devs
+
+
+#########################################
+@pytest.mark.parametrize("compat", compats)
+@pytest.mark.parametrize("complex_data", [False, True])
+@pytest.mark.parametrize("output_type", ["raw", "SI"])
+def test_rx_output_ring(monkeypatch, compat, complex_data, output_type):
+    dev, ref = make_pair(monkeypatch, compat, complex_data, output_type)
+    dev.rx_output_ring_size = 2
+    results = []
+    for _ in range(3):
+        data = dev.rx()
+        assert_same_data(data, ref.rx())
+        results.append(first(data))
+    # Arrays are reused once the ring wraps around
+    assert not np.shares_memory(results[0], results[1])
+    assert np.shares_memory(results[0], results[2])
+
+
+#########################################
+@pytest.mark.parametrize("value", [-1, 1.5, "2"])
+def test_rx_output_ring_size_invalid(monkeypatch, value):
+    dev = make_rx(monkeypatch, compats[0])
+    with pytest.raises(ValueError):
+        dev.rx_output_ring_size = value
+    assert dev.rx_output_ring_size == 0
+
+
+#########################################
+@pytest.mark.parametrize("compat", compats)
+@pytest.mark.parametrize("complex_data", [False, True])
+@pytest.mark.parametrize("output_type", ["raw", "SI"])
+def test_rx_out(monkeypatch, compat, complex_data, output_type):
+    dev, ref = make_pair(monkeypatch, compat, complex_data, output_type)
+    expected = ref.rx()
+    out = [np.zeros(8, dtype=x.dtype) for x in np.atleast_2d(expected)]
+    data = dev.rx(out=out)
+    assert_same_data(data, expected)
+    for o, x in zip(out, np.atleast_2d(expected)):
+        np.testing.assert_array_equal(o, x)
+
+    with pytest.raises(Exception, match="out arrays must"):
+        dev.rx(out=[np.zeros(4, dtype=x.dtype) for x in out])
+
+
+# Channels of mixed widths, so the samples of a buffer hold padding
+mixed_formats = [
+    dict(length=16, bits=12, shift=4, is_signed=True),
+    dict(length=32, bits=24, shift=0, is_signed=False),
+    dict(length=16, bits=14, shift=2, is_signed=True),
+]
+
+
+def make_mixed_rx(monkeypatch, compat):
+    fake_iio.install(monkeypatch, cl.iio)
+    ctx = fake_iio.context()
+    names = ["voltage{}".format(i) for i in range(len(mixed_formats))]
+    channels = []
+    for index, (name, f) in enumerate(zip(names, mixed_formats)):
+        # Set every bit, including those outside the sample
+        words = np.roll(values, index) << f["shift"] | ((1 << f["shift"]) - 1)
+        words |= -1 << (f["bits"] + f["shift"])
+        channels.append(
+            fake_iio.channel(name, index, fmt=fake_iio.data_format(**f), words=words)
+        )
+    ctx.add_device("iio:device0", "adc", channels)
+
+    class fake_rx(compat, rx_core):
+        _rx_channel_names = names
+
+    dev = fake_rx.__new__(fake_rx)
+    dev._ctx = ctx
+    dev._rxadc = dev._ctrl = ctx.find_device("adc")
+    rx_core.__init__(dev, 8)
+    return dev
+
+
+#########################################
+@pytest.mark.parametrize("compat", compats)
+@pytest.mark.parametrize("enabled", [[0, 1, 2], [2, 0], [1]])
+def test_rx_zero_copy_mixed_formats(monkeypatch, compat, enabled):
+    dev, ref = [make_mixed_rx(monkeypatch, compat) for _ in range(2)]
+    dev.rx_zero_copy = True
+    for d in (dev, ref):
+        d.rx_enabled_channels = enabled
+    for _ in range(2):
+        data, expected = dev.rx(), ref.rx()
+        assert len(as_list(data)) == len(enabled)
+        for x, y in zip(as_list(data), as_list(expected)):
+            assert x.dtype == y.dtype
+            np.testing.assert_array_equal(x, y)
+
+
+#########################################
+@pytest.mark.parametrize("compat", compats)
+def test_rx_zero_copy_complex(monkeypatch, compat):
+    dev = make_rx(monkeypatch, compat, complex_data=True)
+    ref = make_rx(monkeypatch, compat, complex_data=True)
+    dev.rx_zero_copy = True
+    data, expected = dev.rx(), ref.rx()
+    # I/Q pairs are viewed from the buffer as single precision
+    assert data.dtype == np.complex64
+    np.testing.assert_array_equal(data, expected)
+
+
+def make_tx(monkeypatch, compat, complex_data, cyclic):
+    fake_iio.install(monkeypatch, cl.iio)
+    ctx = fake_iio.context()
+    names = ["voltage{}".format(i) for i in range(4)]
+    channels = [fake_iio.channel(n, i, output=True) for i, n in enumerate(names)]
+    ctx.add_device("iio:device1", "dac", channels)
+
+    class fake_tx(compat, tx_core):
+        _tx_channel_names = names
+        _tx_complex_data = complex_data
+
+    dev = fake_tx.__new__(fake_tx)
+    dev._ctx = ctx
+    dev._txdac = dev._ctrl = ctx.find_device("dac")
+    tx_core.__init__(dev, cyclic)
+    return dev
+
+
+def waveforms(complex_data, channels, seed):
+    """Waveforms of 8 samples, one complex waveform strided in memory"""
+    data = []
+    for k in range(channels):
+        x = (np.roll(values, seed + k)[:8] * (k + 1) // 2).astype(float)
+        if complex_data:
+            x = x + 1j * x[::-1]
+            x = x if k % 2 else np.repeat(x, 2)[::2]
+        data.append(x)
+    return data
+
+
+def interleaved(data, complex_data):
+    """Bytes pushed for the waveforms, interleaved channel by channel"""
+    columns = []
+    for x in data:
+        columns += [x.real, x.imag] if complex_data else [x]
+    return np.stack(columns, axis=1).astype("<i2").tobytes()
+
+
+#########################################
+@pytest.mark.parametrize("compat", tx_compats)
+@pytest.mark.parametrize("complex_data", [False, True])
+@pytest.mark.parametrize("cache_size", [0, 1 << 20])
+def test_tx_push(monkeypatch, compat, complex_data, cache_size):
+    dev = make_tx(monkeypatch, compat, complex_data, cyclic=False)
+    dev.tx_waveform_cache_size = cache_size
+    channels = len(dev.tx_enabled_channels)
+    sent = [waveforms(complex_data, channels, seed) for seed in (0, 1, 0)]
+    for data in sent:
+        dev.tx(data)
+    assert dev._txdac.pushes == [(interleaved(d, complex_data), False) for d in sent]
+
+
+#########################################
+@pytest.mark.parametrize("compat", tx_compats)
+@pytest.mark.parametrize("complex_data", [False, True])
+@pytest.mark.parametrize("cache_size", [0, 1 << 20])
+def test_tx_push_cyclic(monkeypatch, compat, complex_data, cache_size):
+    dev = make_tx(monkeypatch, compat, complex_data, cyclic=True)
+    dev.tx_waveform_cache_size = cache_size
+    channels = len(dev.tx_enabled_channels)
+    sent = [waveforms(complex_data, channels, seed) for seed in (0, 1, 0)]
+    for data in sent:
+        dev.tx(data)
+        with pytest.raises(Exception, match="cyclic mode"):
+            dev.tx(data)
+        dev.tx_destroy_buffer()
+    assert dev._txdac.pushes == [(interleaved(d, complex_data), True) for d in sent]
+    if cache_size:
+        assert dev.tx_waveform_cache_stats["hits"] == 1
+
+
+#########################################
+@pytest.mark.parametrize("compat", tx_compats)
+@pytest.mark.parametrize("complex_data", [False, True])
+def test_tx_push_single_channel(monkeypatch, compat, complex_data):
+    dev = make_tx(monkeypatch, compat, complex_data, cyclic=False)
+    dev.tx_enabled_channels = [1]
+    data = waveforms(complex_data, 2, 0)[1]
+    dev.tx(data)
+    assert dev._txdac.pushes == [(interleaved([data], complex_data), False)]
+
+
+#########################################
+def test_rx_destroy_buffer_v1_stream(monkeypatch):
+    dev = make_rx(monkeypatch, cl.compat_libiio_v1_rx)
+    dev.rx_enabled_channels = [0, 1]
+    dev.rx()
+    assert dev._rx_stream.nb_blocks == 4
+    with pytest.raises(Exception, match="destroyed"):
+        dev.rx_buffer_num_blocks = 8
+
+    # Settings changed after destroying the buffer apply to the next stream
+    dev.rx_destroy_buffer()
+    dev.rx_buffer_num_blocks = 8
+    dev.rx_enabled_channels = [1]
+    dev.rx_zero_copy = True
+    data = dev.rx()
+    assert dev._rx_stream.nb_blocks == 8
+    assert [chan.id for chan in dev._rxbuf.channels] == ["voltage1"]
+    # Second block of the raw words, shifted and sign extended
+    np.testing.assert_array_equal(data, np.roll(values, 1)[8:16])
+
+
+def expected_block(index, block, size=8):
+    """Raw samples of a channel in the given refill of the fake buffer"""
+    start = block * size % len(values)
+    return np.roll(values, index)[start : start + size]
+
+
+#########################################
+@pytest.mark.parametrize("compat", compats)
+def test_rx_streaming_stats(monkeypatch, compat):
+    dev = make_rx(monkeypatch, compat)
+    dev.rx_enabled_channels = [0, 1]
+    regs = dev._rxadc.regs
+    # Status bits of the AXI ADC are cleared by writing ones
+    dev._rxadc.reg_write = lambda reg, value: regs.update(
+        {reg: regs.get(reg, 0) & ~value}
+    )
+    rx = dev.rx
+    captured = []
+    blocked, release = threading.Event(), threading.Event()
+
+    def blocking_rx():
+        if len(captured) == 6:
+            # Refill waiting for hardware
+            blocked.set()
+            release.wait(5)
+        captured.append(rx())
+        if len(captured) % 2 == 0:
+            regs[0x80000088] = 0x4
+        return captured[-1]
+
+    dev.rx = blocking_rx
+    dev.rx_streaming_start(queue_depth=2, check_overflow=True)
+    assert blocked.wait(5)
+    assert dev.rx_streaming_stats == {"blocks": 6, "dropped": 4, "overflows": 3}
+
+    # Stopping waits for the capture in progress, then no more are made
+    stopper = threading.Thread(target=dev.rx_streaming_stop)
+    stopper.start()
+    stopper.join(0.1)
+    assert stopper.is_alive() and dev.rx_streaming
+    release.set()
+    stopper.join(5)
+    assert not stopper.is_alive() and not dev.rx_streaming
+    assert dev.rx_streaming_stats == {"blocks": 7, "dropped": 5, "overflows": 3}
+    assert len(captured) == 7
+
+    # Queued buffers are the first ones captured, followed by the end marker
+    for block in range(2):
+        data = dev.rx_streaming_get(timeout=1)
+        for index, x in enumerate(data):
+            np.testing.assert_array_equal(x, expected_block(index, block))
+    assert dev.rx_streaming_get(timeout=1) is None
+    assert dev.rx_streaming_get(timeout=1) is None
+
+
+#########################################
+@pytest.mark.parametrize("compat", compats)
+def test_rx_iter_blocks(monkeypatch, compat):
+    dev = make_rx(monkeypatch, compat)
+    dev.rx_enabled_channels = [0, 1]
+    blocks = list(dev.rx_iter(3))
+    assert len(blocks) == 3 and dev._rxadc.refills == 3
+    for block, data in enumerate(blocks):
+        for index, x in enumerate(data):
+            np.testing.assert_array_equal(x, expected_block(index, block))
+
+    # Without a count blocks are received until the generator is closed
+    blocks = dev.rx_iter()
+    next(blocks)
+    next(blocks)
+    blocks.close()
+    assert dev._rxadc.refills == 5
+    with pytest.raises(StopIteration):
+        next(blocks)
+    assert list(dev.rx_iter(0)) == []
+    assert dev._rxadc.refills == 5
+
+    dev.rx_output_type = "SI"
+    for block, data in enumerate(dev.rx_iter(2), 5):
+        for index, x in enumerate(data):
+            np.testing.assert_allclose(x, 0.5 * (expected_block(index, block) + 2))
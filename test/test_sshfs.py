@@ -1,7 +1,14 @@
+import io
+import subprocess
+
 import pytest
 
 import adi
 
+pytest.importorskip("paramiko")
+
+from adi.sshfs import sshfs as sshfs_class  # noqa: E402
+
 hardware = ["ad9371", "ad9144"]
 classname = "adi.sshfs.sshfs"
 
@@ -33,3 +40,75 @@ def test_sshfs_listdir(iio_uri, classname, username, password):
 def test_sshfs_gettext(iio_uri, classname, username, password):
     sshfs = open_sshfs(classname, iio_uri, username, password)
     assert sshfs.gettext("/proc/version").startswith("Linux version")
+
+
+@pytest.mark.iio_hardware(hardware)
+@pytest.mark.parametrize("classname", [(classname)])
+def test_sshfs_read_many(iio_uri, classname, username, password):
+    sshfs = open_sshfs(classname, iio_uri, username, password)
+    paths = ["/proc/version", "/etc/os-release", "/does/not/exist"]
+    texts = sshfs.read_many(paths)
+    assert list(texts) == paths
+    assert texts["/proc/version"] == sshfs.gettext("/proc/version")
+    assert texts["/etc/os-release"] == sshfs.gettext("/etc/os-release")
+    assert texts["/does/not/exist"] is None
+
+
+class local_ssh:
+    """SSH client running commands in a local shell"""
+
+    def exec_command(self, cmd):
+        out = subprocess.run(["sh", "-c", cmd], stdout=subprocess.PIPE).stdout
+        return None, io.BytesIO(out), io.BytesIO()
+
+
+class local_sftp:
+    """SFTP session opening local files, failing like paramiko for others"""
+
+    class channel:
+        closed = False
+
+    def get_channel(self):
+        return self.channel()
+
+    def open(self, path):
+        try:
+            return open(path, "rb")
+        except OSError as ex:
+            raise IOError(str(ex))
+
+
+def local_sshfs():
+    fs = sshfs_class.__new__(sshfs_class)
+    fs.ssh = local_ssh()
+    fs._sftp = local_sftp()
+    return fs
+
+
+#########################################
+def test_sshfs_read_many_markers(tmp_path):
+    files = {
+        "status": "Link is enabled\nLink status: DATA\n",
+        "no_newline": "250.000 MHz",
+        "empty": "",
+        "spaced name": "0 1\n",
+    }
+    for name, text in files.items():
+        (tmp_path / name).write_text(text)
+    paths = [str(tmp_path / name) for name in files]
+    paths.insert(2, str(tmp_path / "missing"))
+
+    fs = local_sshfs()
+    texts = fs.read_many(paths)
+    assert list(texts) == paths
+    for name, text in files.items():
+        assert texts[str(tmp_path / name)] == text.strip()
+        assert fs.gettext(str(tmp_path / name)) == text.strip()
+    assert texts[str(tmp_path / "missing")] is None
+    assert fs.read_many([]) == {}
+
+
+#########################################
+def test_sshfs_gettext_missing(tmp_path):
+    # Unreadable files read as empty text, as with cat over SSH
+    assert local_sshfs().gettext(str(tmp_path / "missing")) == ""
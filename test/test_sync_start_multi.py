@@ -0,0 +1,124 @@
+import threading
+import time
+from test import fake_iio
+
+import numpy as np
+import pytest
+
+from adi.sync_start import sync_start_multi
+
+
+class fake_som:
+    """SOM with its own context whose captures run the given function"""
+
+    def __init__(self, index, capture):
+        self.uri = "ip:som{}".format(index)
+        self.ctx = fake_iio.context(self.uri)
+        self.index = index
+        self.capture = capture
+        self.rx_sync_start = "disarm"
+        self.buffers = 0
+
+    def rx_destroy_buffer(self):
+        pass
+
+    def _rx_init_channels(self):
+        self.buffers += 1
+
+    def rx(self):
+        self.capture(self)
+        return [np.full(4, self.index)]
+
+
+class fake_multi(sync_start_multi):
+    def __init__(self, soms):
+        self.primary = soms[0]
+        self.secondaries = soms[1:]
+        self._rx_initialized = True
+        self.sysrefs = 0
+
+    def sysref_request(self):
+        self.sysrefs += 1
+
+
+#########################################
+def test_sync_start_multi_rx_concurrent():
+    # Captures only pass the barrier if all of them are in flight together
+    barrier = threading.Barrier(4, timeout=5)
+    soms = [fake_som(i, lambda som: barrier.wait()) for i in range(4)]
+    multi = fake_multi(soms)
+    data = multi.rx()
+    assert [x[0] for x in data] == [0, 1, 2, 3]
+    assert multi.sysrefs == 1
+    for som in soms:
+        assert som.rx_sync_start == "arm"
+        assert som.buffers == 1
+
+
+#########################################
+def test_sync_start_multi_rx_failure():
+    release = threading.Event()
+
+    def hang(som):
+        release.wait(10)
+
+    def fail(som):
+        raise OSError("capture failed")
+
+    soms = [fake_som(0, hang), fake_som(1, fail), fake_som(2, hang)]
+    multi = fake_multi(soms)
+    start = time.monotonic()
+    try:
+        with pytest.raises(OSError, match="capture failed"):
+            multi.rx()
+        assert time.monotonic() - start < 5
+    finally:
+        release.set()
+
+
+class flaky_multi(fake_multi):
+    """Manager whose setup fails the given number of times"""
+
+    def __init__(self, soms, failures):
+        super().__init__(soms)
+        self.failures = failures
+        self.setups = 0
+        self.reinits = 0
+
+    def reinitialize(self):
+        self.reinits += 1
+
+    def setup(self):
+        self.setups += 1
+        if self.setups <= self.failures:
+            raise OSError("lock-up")
+
+
+#########################################
+def test_sync_start_multi_setup_retries():
+    multi = flaky_multi([fake_som(0, None)], failures=2)
+    multi._retry_pre_rx_setup(multi.setup, retries=3)
+    assert multi.setups == 3 and multi.reinits == 2
+
+    multi = flaky_multi([fake_som(0, None)], failures=3)
+    with pytest.raises(Exception, match="Board reboot required"):
+        multi._retry_pre_rx_setup(multi.setup, retries=3)
+    assert multi.setups == 3 and multi.reinits == 3
+
+    # Failures are not retried once the time for the setup is up
+    multi = flaky_multi([fake_som(0, None)], failures=3)
+    multi._pre_rx_setup_timeout = 0
+    with pytest.raises(Exception, match="Board reboot required"):
+        multi._retry_pre_rx_setup(multi.setup, retries=10)
+    assert multi.setups == 1 and multi.reinits == 0
+
+
+#########################################
+def test_sync_start_multi_setup_fsm_timeout():
+    multi = flaky_multi([fake_som(0, None), fake_som(1, None)], failures=0)
+    multi._jesd204_fsm_timeout = 0.05
+    multi._device_is_running = lambda dev, index, verbose: ("running", "link_setup")
+    # A FSM that did not finish is not retried, each try would wait again
+    with pytest.raises(TimeoutError, match="JESD204 FSM did not finish"):
+        multi._retry_pre_rx_setup(multi._jesd204_fsm_sync, retries=10)
+    assert multi.reinits == 0